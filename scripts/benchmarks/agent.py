@@ -0,0 +1,43 @@
+"""Benchmark repeated extractions of a small package in the current environment.
+
+Compare a detector process (and a shell) started for every extraction with the long-lived detector agent,
+which forks a process with the detector already imported for every extraction.
+"""
+
+import tempfile
+from pathlib import Path
+from timeit import default_timer
+
+from aexpy.extracting.base import BaseExtractor
+from aexpy.models import ApiDescription, Distribution
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        package = root / "bench"
+        package.mkdir()
+        (package / "__init__.py").write_text("from .core import *\n")
+        (package / "core.py").write_text(
+            "\n".join(
+                f"class C{i}:\n    def f(self, a: int, b: str = '') -> int:\n        return a\n"
+                for i in range(50)
+            )
+        )
+        dist = Distribution(rootPath=root, topModules=["bench"])
+
+        print(f"{'mode':>10} {'s/extract':>10}")
+        for agent in (False, True):
+            extractor = BaseExtractor(agent=agent)
+            count = 10
+            start = default_timer()
+            for _ in range(count):
+                api = ApiDescription(distribution=dist)
+                extractor.extract(dist, api)
+                assert len(api.classes) == 50
+            elapsed = default_timer() - start
+            print(f"{'agent' if agent else 'process':>10} {elapsed / count:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""Benchmark alias resolution on synthetic API descriptions of growing size.
+
+Time per entry should stay roughly constant when the API grows.
+"""
+
+from timeit import default_timer
+
+from aexpy.extracting.base import resolveAlias
+
+from synthetic import generate
+
+
+def main():
+    print(f"{'entries':>10} {'seconds':>10} {'us/entry':>10}")
+    for modules in (50, 100, 200, 400, 800):
+        api = generate(modules)
+        start = default_timer()
+        resolveAlias(api)
+        elapsed = default_timer() - start
+        print(f"{len(api):>10} {elapsed:>10.4f} {elapsed / len(api) * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
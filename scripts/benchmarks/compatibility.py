@@ -0,0 +1,95 @@
+"""Benchmark type compatibility checks of ChangeParameterType-like entries.
+
+Compare the previous checker, comparing structures on every check without memo,
+with the long-lived checker of the description, memoizing results of types interned in the type table.
+Types are copies drawn from a pool, as equal types are distinct objects in loaded descriptions, which are compared directly,
+or interned in the type table of the description, as types of extracted descriptions (or after ApiDescription.internTypes).
+"""
+
+import random
+from timeit import default_timer
+
+from synthetic import generate
+
+from aexpy.diffing.evaluators.typing import ApiTypeCompatibilityChecker
+from aexpy.models.typing import TypeFactory, TypeType
+
+
+class PreviousChecker(ApiTypeCompatibilityChecker):
+    """The checker before memoization, created for every check."""
+
+    def isCompatibleTo(self, /, a, b):
+        return self.compare(a, b)
+
+
+def randomType(pool: list[TypeType], depth: int = 0) -> TypeType:
+    if depth > 2 or random.random() < 0.3:
+        return random.choice(pool)
+    match random.randrange(4):
+        case 0:
+            return TypeFactory.sum(
+                *(randomType(pool, depth + 1) for _ in range(random.randint(2, 4)))
+            )
+        case 1:
+            return TypeFactory.list(randomType(pool, depth + 1))
+        case 2:
+            return TypeFactory.dict(
+                randomType(pool, depth + 1), randomType(pool, depth + 1)
+            )
+        case _:
+            return TypeFactory.callable(
+                TypeFactory.product(randomType(pool, depth + 1)),
+                randomType(pool, depth + 1),
+            )
+
+
+def main():
+    random.seed(0)
+    api = generate(20)
+    classes = sorted(api.classes)
+    for i, id in enumerate(classes):
+        # a chain of subclasses in each module
+        api.classes[id].mros = [id, *classes[max(0, i - 5) : i][::-1], "object"]
+
+    pool: list[TypeType] = [TypeFactory.any(), TypeFactory.none()]
+    pool.extend(TypeFactory.fromType(t) for t in (int, str, object))
+    pool.extend(
+        TypeFactory.fromType(int).model_copy(update={"id": id}) for id in classes
+    )
+    for _ in range(200):
+        pool.append(randomType(pool))
+    # changed types in a project are mostly among a few common ones
+    common = pool[-60:]
+    pairs = [
+        (
+            random.choice(common).model_copy(deep=True),
+            random.choice(common).model_copy(deep=True),
+        )
+        for _ in range(20000)
+    ]
+
+    print(f"{'checker':>10} {'seconds':>8}")
+    start = default_timer()
+    fresh = [PreviousChecker(api).isCompatibleTo(a, b) for a, b in pairs]
+    print(f"{'fresh':>10} {default_timer() - start:>8.3f}")
+    start = default_timer()
+    shared = [
+        ApiTypeCompatibilityChecker.of(api).isCompatibleTo(a, b) for a, b in pairs
+    ]
+    print(f"{'shared':>10} {default_timer() - start:>8.3f}")
+    assert fresh == shared
+
+    start = default_timer()
+    table = api.typeTable()
+    pairs = [(table.intern(a), table.intern(b)) for a, b in pairs]
+    print(f"{'intern':>10} {default_timer() - start:>8.3f}")
+    start = default_timer()
+    checker = ApiTypeCompatibilityChecker(api)
+    interned = [checker.isCompatibleTo(a, b) for a, b in pairs]
+    print(f"{'interned':>10} {default_timer() - start:>8.3f}")
+    assert fresh == interned
+    return fresh
+
+
+if __name__ == "__main__":
+    main()
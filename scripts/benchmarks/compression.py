@@ -0,0 +1,56 @@
+"""Benchmark size and (de)compression time of API description products.
+
+Compare gzip (aexpy.io.gzip) with zstd (aexpy.io.zstd), with and without a dictionary
+trained on other products.
+"""
+
+import gzip
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from timeit import default_timer
+
+from aexpy.io import readBytes
+from aexpy.io.zstd import ZSTD_DICT_ENV, compress, trainDictionary
+
+from synthetic import generate
+
+
+def best(func, repeat: int = 3):
+    result = None
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = default_timer()
+        result = func()
+        elapsed = min(elapsed, default_timer() - start)
+    return result, elapsed
+
+
+def main():
+    raw = generate(400).model_dump_json().encode()
+    samples = [generate(n, width=10).model_dump_json().encode() for n in (20, 40, 60)]
+
+    print(f"{len(raw) / 2**20:.1f} MiB JSON")
+    print(f"{'codec':>10} {'ratio':>8} {'compress s':>12} {'decompress s':>14}")
+
+    data, elapsed = best(lambda: gzip.compress(raw))
+    _, back = best(lambda: readBytes(data))
+    print(f"{'gzip':>10} {len(raw) / len(data):>8.1f} {elapsed:>12.3f} {back:>14.3f}")
+
+    with TemporaryDirectory() as tmpdir:
+        dictFile = Path(tmpdir) / "aexpy.dict"
+        dictFile.write_bytes(trainDictionary(samples))
+        for name, dictionary in (("zstd", None), ("zstd+dict", dictFile)):
+            if dictionary:
+                os.environ[ZSTD_DICT_ENV] = str(dictionary)
+            data, elapsed = best(lambda: compress(raw))
+            result, back = best(lambda: readBytes(data))
+            assert result == raw
+            print(
+                f"{name:>10} {len(raw) / len(data):>8.1f} {elapsed:>12.3f} {back:>14.3f}"
+            )
+        os.environ.pop(ZSTD_DICT_ENV, None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark constraint calls per entry pair and time of DefaultDiffer.
+
+Compare calling every constraint for every pair (the previous behavior)
+with dispatching constraints by the entry types of the pair,
+skipping pairs unchanged by fingerprint,
+and diffing serially with diffing in a process pool (calls are not counted in workers).
+"""
+
+import os
+import random
+from timeit import default_timer
+
+from aexpy.diffing.differs.checkers import DiffConstraint
+from aexpy.diffing.differs.default import DefaultDiffer
+from aexpy.models import ApiDifference
+from aexpy.models.description import FunctionEntry, Parameter
+
+from synthetic import generate
+
+
+class UndispatchedDiffer(DefaultDiffer):
+    def dispatch(self, /, old, new):
+        return self.constraints
+
+
+def modify(seed: int = 0):
+    random.seed(seed)
+    api = generate(100)
+    for id in random.sample(sorted(api.functions), len(api.functions) // 10):
+        del api.functions[id]
+    for id in random.sample(sorted(api.functions), len(api.functions) // 10):
+        entry: FunctionEntry = api.functions[id]
+        entry.parameters.append(Parameter(name="c"))
+    for id in random.sample(sorted(api.classes), len(api.classes) // 10):
+        api.classes[id].docs += " Changed."
+    api.reindex()
+    return api
+
+
+def run(differ: DefaultDiffer, old, new):
+    calls = 0
+    call = DiffConstraint.__call__
+
+    def counted(*args):
+        nonlocal calls
+        calls += 1
+        return call(*args)
+
+    DiffConstraint.__call__ = counted  # type: ignore
+    pairs = len(old) + len([entry for entry in new if entry.id not in old])
+    for api in (old, new):
+        api.clearFingerprints()
+        api.clearResolveCache()
+    product = ApiDifference()
+    start = default_timer()
+    try:
+        differ.diff(old, new, product)
+    finally:
+        DiffConstraint.__call__ = call  # type: ignore
+    elapsed = default_timer() - start
+    return product, calls / pairs, elapsed
+
+
+def main():
+    old, new = generate(100), modify()
+    print(f"{len(old)} entries, {len(DefaultDiffer().constraints)} constraints")
+    print(f"{'differ':>14} {'calls/pair':>12} {'seconds':>10}")
+    results = []
+    for name, differ in (
+        ("undispatched", UndispatchedDiffer(workers=1, skipUnchanged=False)),
+        ("dispatched", DefaultDiffer(workers=1, skipUnchanged=False)),
+        ("skip unchanged", DefaultDiffer(workers=1)),
+        (f"parallel x{os.cpu_count()}", DefaultDiffer(workers=os.cpu_count())),
+    ):
+        product, calls, elapsed = run(differ, old, new)
+        results.append(product)
+        print(f"{name:>14} {calls:>12.2f} {elapsed:>10.3f}")
+    assert all(result.entries == results[0].entries for result in results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark rule calls per entry and time of DefaultEvaluator.
+
+Compare calling every rule for every entry (the previous behavior)
+with running the rules indexed by the kind of the entry.
+"""
+
+from timeit import default_timer
+
+from aexpy.diffing.differs.default import DefaultDiffer
+from aexpy.diffing.evaluators.checkers import EvalRule
+from aexpy.diffing.evaluators.default import DefaultEvaluator
+from aexpy.models import ApiDifference
+
+from diff import modify
+from synthetic import generate
+
+
+class UnindexedEvaluator(DefaultEvaluator):
+    def evaluate(self, /, entry, product, old, new):
+        for rule in self.rules:
+            rule(entry, product, old, new)
+
+
+def run(evaluator: DefaultEvaluator, old, new):
+    result = ApiDifference(old=old.distribution, new=new.distribution)
+    DefaultDiffer().diff(old, new, result)
+
+    calls = 0
+    call = EvalRule.__call__
+
+    def counting(self, /, *args):
+        nonlocal calls
+        calls += 1
+        return call(self, *args)
+
+    EvalRule.__call__ = counting
+    try:
+        start = default_timer()
+        evaluator.diff(old, new, result)
+        elapsed = default_timer() - start
+    finally:
+        EvalRule.__call__ = call
+    return result, calls, elapsed
+
+
+def main():
+    old, new = generate(100), modify()
+
+    print(f"{'evaluator':>10} {'calls/entry':>12} {'seconds':>8}")
+    results = []
+    for name, evaluator in (
+        ("unindexed", UnindexedEvaluator()),
+        ("indexed", DefaultEvaluator()),
+    ):
+        result, calls, elapsed = run(evaluator, old, new)
+        results.append(result)
+        print(f"{name:>10} {calls / len(result.entries):>12.2f} {elapsed:>8.3f}")
+    assert results[0].entries == results[1].entries
+
+    evaluator = DefaultEvaluator(timing=True)
+    run(evaluator, old, new)
+    print()
+    print(f"{'rule':>28} {'calls':>6} {'seconds':>8}")
+    for rule, timing in sorted(
+        evaluator.timings.items(), key=lambda x: x[1].elapsed, reverse=True
+    )[:5]:
+        if timing.calls:
+            print(f"{rule.kind or '*':>28} {timing.calls:>6} {timing.elapsed:>8.4f}")
+
+
+if __name__ == "__main__":
+    main()
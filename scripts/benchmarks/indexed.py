@@ -0,0 +1,40 @@
+"""Benchmark overview and single-entry access on JSON and indexed API descriptions."""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from timeit import default_timer
+
+from aexpy.io import FileProductIO, load
+
+from synthetic import generate
+
+
+def main():
+    api = generate(400)
+    target = "pkg.mod200.f10"
+    print(f"{len(api)} entries")
+    print(f"{'format':>8} {'open s':>8} {'entry s':>8} {'iterate s':>10}")
+    with TemporaryDirectory() as tmpdir:
+        for format in ("json", "indexed"):
+            path = Path(tmpdir) / f"api.{format}"
+            FileProductIO(path, format=format).save(api, "")
+
+            start = default_timer()
+            loaded = load(path)
+            opening = default_timer() - start
+            loaded.overview()
+
+            start = default_timer()
+            assert loaded[target] is not None
+            access = default_timer() - start
+
+            start = default_timer()
+            count = sum(1 for _ in loaded)
+            iteration = default_timer() - start
+            assert count == len(api)
+
+            print(f"{format:>8} {opening:>8.3f} {access:>8.5f} {iteration:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark time and peak memory of loading API description products.
+
+Compare the previous approach (decompress, decode, json.loads, model_validate)
+with aexpy.io.load, for plain and gzip JSON files.
+"""
+
+import gzip
+import json
+import tracemalloc
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from timeit import default_timer
+
+from aexpy.io import load
+from aexpy.models import ApiDescription
+
+from synthetic import generate
+
+
+def legacyLoad(path: Path):
+    data = path.read_bytes()
+    try:
+        data = gzip.decompress(data)
+    except gzip.BadGzipFile:
+        pass
+    return ApiDescription.model_validate(json.loads(data.decode()))
+
+
+def measure(func, path: Path):
+    tracemalloc.start()
+    start = default_timer()
+    func(path)
+    elapsed = default_timer() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    api = generate(400)
+    raw = api.model_dump_json().encode()
+    with TemporaryDirectory() as tmpdir:
+        plain = Path(tmpdir) / "api.json"
+        plain.write_bytes(raw)
+        compressed = Path(tmpdir) / "api.json.gz"
+        compressed.write_bytes(gzip.compress(raw))
+
+        print(f"{len(api)} entries, {len(raw) / 2**20:.1f} MiB JSON")
+        print(f"{'file':>8} {'loader':>8} {'seconds':>10} {'peak MiB':>10}")
+        for name, path in (("plain", plain), ("gzip", compressed)):
+            for loader, func in (("legacy", legacyLoad), ("load", load)):
+                elapsed, peak = measure(func, path)
+                print(f"{name:>8} {loader:>8} {elapsed:>10.3f} {peak / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Benchmark size and loading time of full and slim (reference-only) API differences.
+
+Slim entries keep the ids of old and new entries instead of the entries,
+which are resolved from the attached API descriptions on access.
+"""
+
+from timeit import default_timer
+
+from aexpy.diffing.differs.default import DefaultDiffer
+from aexpy.io import load
+from aexpy.models import ApiDifference
+
+from diff import modify
+from synthetic import generate
+
+
+def main():
+    old, new = generate(100), modify()
+    result = ApiDifference(old=old.distribution, new=new.distribution)
+    DefaultDiffer().diff(old, new, result)
+    slim = result.slim()
+
+    print(f"{len(result.entries)} entries")
+    print(f"{'mode':>6} {'size MiB':>10} {'load s':>8}")
+    for name, product in (("full", result), ("slim", slim)):
+        raw = product.model_dump_json().encode()
+        start = default_timer()
+        loaded = load(raw, ApiDifference)
+        elapsed = default_timer() - start
+        print(f"{name:>6} {len(raw) / 2**20:>10.2f} {elapsed:>8.3f}")
+
+    loaded.attach(old, new)
+    for kind in result.kinds():
+        for a, b in zip(result.kind(kind), loaded.kind(kind)):
+            assert a.old == b.old and a.new == b.new, a.id
+
+
+if __name__ == "__main__":
+    main()
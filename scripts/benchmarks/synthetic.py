@@ -0,0 +1,48 @@
+"""Synthetic API descriptions for benchmarks."""
+
+from aexpy.models import ApiDescription
+from aexpy.models.description import (ClassEntry, FunctionEntry, ModuleEntry,
+                                      Parameter)
+
+
+def generate(modules: int, width: int = 20):
+    api = ApiDescription()
+    root = ModuleEntry(id="pkg", name="pkg")
+    api.add(root)
+    for i in range(modules):
+        modId = f"pkg.mod{i}"
+        mod = ModuleEntry(id=modId, name=f"mod{i}", parent="pkg")
+        root.members[f"mod{i}"] = modId
+        api.add(mod)
+        for j in range(width):
+            clsId = f"{modId}.C{j}"
+            funcId = f"{modId}.f{j}"
+            api.add(
+                ClassEntry(
+                    id=clsId,
+                    name=f"C{j}",
+                    parent=modId,
+                    docs=f"Class C{j}.",
+                    mros=[clsId, "object"],
+                )
+            )
+            api.add(
+                FunctionEntry(
+                    id=funcId,
+                    name=f"f{j}",
+                    parent=modId,
+                    docs=f"Function f{j}.\n\n" + "Some documents. " * 10,
+                    src=f"def f{j}(a, b=1, *args, **kwargs):\n    return a + b\n",
+                    parameters=[
+                        Parameter(name="a"),
+                        Parameter(name="b", default="1", optional=True),
+                    ],
+                )
+            )
+            mod.members[f"C{j}"] = clsId
+            mod.members[f"f{j}"] = funcId
+            # re-export from the package root, and from the previous module
+            root.members[f"C{i}_{j}"] = clsId
+            if i > 0:
+                api[f"pkg.mod{i - 1}"].members[f"g{j}"] = funcId  # type: ignore
+    return api
@@ -1,15 +1,20 @@
 import importlib
+import json
 import logging
+import os
 import pkgutil
 import platform
 import shutil
+import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Union
+from typing import Any, Dict, List, Union
 
 from .compat import (AttributeEntry, ClassEntry, Distribution, FunctionEntry,
                      ModuleEntry, SpecialEntry)
 from .processor import Processor
+from .stream import EntryStream
 
 TRANSFER_BEGIN = "AEXPY_TRANSFER_BEGIN"
 
@@ -64,13 +69,155 @@ def importModule(name: str):
     return modules
 
 
-def main(dist: Distribution):
+def listModules(name: str):
+    """List the submodules of a top level module, only packages are imported (to walk into them)."""
+
+    logger = logging.getLogger("list")
+    module = importlib.import_module(name)
+    result: "list[str]" = []
+
+    def onerror(name):
+        logger.error(f"Failed to import {name}")
+
+    try:
+        for sub in pkgutil.walk_packages(
+            path=module.__path__, prefix=module.__name__ + ".", onerror=onerror
+        ):
+            if sub.name.endswith(".__main__"):
+                logger.info(f"Ignore {sub.name}.")
+                continue
+            result.append(sub.name)
+    except Exception:
+        logger.error(f"Failed to list submodules of {name}", exc_info=True)
+    except SystemExit:
+        logger.error(f"Failed to list submodules of {name}", exc_info=True)
+    return result
+
+
+def importShard(root: str, names: "list[str]"):
+    logger = logging.getLogger("import")
+
+    modules = [importlib.import_module(root)]
+    for name in names:
+        try:
+            logger.debug(f"Import {name}.")
+            modules.append(importlib.import_module(name))
+        except Exception:
+            logger.error(f"Failed to import {name}", exc_info=True)
+        except SystemExit:
+            logger.error(f"Failed to import {name}", exc_info=True)
+    return modules
+
+
+def split(items: "list[str]", count: int):
+    """Split items into at most count contiguous shards, keeping modules of the same package together."""
+
+    size = -(-len(items) // count) if items else 1
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def runShard(rootPath: Path, root: str, names: "list[str]") -> "list[Dict[str, Any]]":
+    """Detect the shard in a new detector process, return the entries (as JSON objects)."""
+
+    logger = logging.getLogger("shard")
+    logger.info(f"Detect shard of {root}: {len(names)} submodules.")
+    res = subprocess.run(
+        [sys.executable, "-m", __package__ or "aexpy_apidetector", "--shard"],
+        input=json.dumps({"rootPath": str(rootPath), "root": root, "modules": names}),
+        capture_output=True,
+        text=True,
+    )
+    # forward logs of the shard process
+    sys.stderr.write(res.stderr)
+    res.check_returncode()
+    return json.loads(res.stdout.split(TRANSFER_BEGIN, 1)[1])
+
+
+def merge(entries: "dict[str, Dict[str, Any]]", entry: "Dict[str, Any]"):
+    """
+    Merge the entry by id, as if the shards were detected in one process.
+
+    A shard may reach an entry only through a re-export, without visiting the module or class owning it,
+    so the fields set by those visits (stream.MUTABLE_FIELDS) keep their defaults in that shard:
+    private and a non-static scope are only set by the visits of the owner, and the first non-empty annotation wins.
+    Members and aliases are united, since submodules are members of their packages only after imported.
+    """
+
+    existing = entries.setdefault(entry["id"], entry)
+    if existing is entry:
+        return
+    if entry.get("private"):
+        existing["private"] = True
+    if "scope" in existing:
+        existing["scope"] = max(existing["scope"], entry["scope"])
+    if "annotation" in existing and not existing["annotation"]:
+        existing["annotation"] = entry["annotation"]
+    existing["alias"] = sorted(set(existing["alias"]) | set(entry["alias"]))
+    if "members" in existing:
+        members = dict(entry["members"], **existing["members"])
+        existing["members"] = {name: members[name] for name in sorted(members)}
+
+
+def mainSharded(dist: Distribution, shards: int):
+    """Detect each shard of the submodules in its own process, and merge entries by id."""
+
+    logger = logging.getLogger("main")
+
+    assert dist.rootPath
+    rootPath = dist.rootPath.resolve()
+    entries: "dict[str, Dict[str, Any]]" = {}
+    successToplevels = []
+
+    for topLevel in dist.topModules:
+        try:
+            logger.info(f"List module {topLevel}.")
+            names = listModules(topLevel)
+        except Exception:
+            logger.error(f"Failed to import module {topLevel}.", exc_info=True)
+            continue
+
+        parts = split(names, shards) or [[]]
+        success = False
+        with ThreadPoolExecutor(
+            max_workers=min(len(parts), os.cpu_count() or 1)
+        ) as pool:
+            futures = [
+                pool.submit(runShard, rootPath, topLevel, part) for part in parts
+            ]
+            for part, future in zip(parts, futures):
+                try:
+                    for entry in future.result():
+                        merge(entries, entry)
+                    success = True
+                except Exception:
+                    logger.error(
+                        f"Failed to extract shard of {topLevel}: {part}.",
+                        exc_info=True,
+                    )
+        if success:
+            successToplevels.append(topLevel)
+
+    assert len(successToplevels) > 0, "No top level module extracted."
+
+    return list(entries.values())
+
+
+def mainShard(root: str, names: "list[str]"):
+    processor = Processor()
+    modules = importShard(root, names)
+    processor.process(modules[0], modules)
+    return processor.allEntries()
+
+
+def main(dist: Distribution, stream: "EntryStream | None" = None):
+    """Detect entries, return all entries, or write them to the stream if given."""
+
     logger = logging.getLogger("main")
 
     platformStr = f"{platform.platform()} {platform.machine()} {platform.processor()} {platform.python_implementation()} {platform.python_version()}"
     logging.info(f"Platform: {platformStr}")
 
-    processor = Processor()
+    processor = Processor(stream)
 
     successToplevels = []
 
@@ -97,9 +244,29 @@ def main(dist: Distribution):
 
     assert len(successToplevels) > 0, "No top level module extracted."
 
+    if stream is not None:
+        processor.flush()
+        stream.finish(processor.allEntries())
+        return []
     return processor.allEntries()
 
 
+def mainStream(dist: Distribution, path: str, shards: int = 1):
+    """Detect entries and write them to the stream file."""
+
+    assert dist.rootPath
+
+    sys.path.insert(0, str(dist.rootPath.resolve()))
+
+    with open(path, "w", encoding="utf-8") as file:
+        stream = EntryStream(file)
+        if shards > 1:
+            stream.writeRaw(mainSharded(dist, shards))
+        else:
+            main(dist, stream)
+    clean(dist.rootPath)
+
+
 def clean(path: Path):
     logger = logging.getLogger("clean")
     for d in path.glob("**/__pycache__"):
@@ -111,22 +278,60 @@ def clean(path: Path):
             logger.error(f"Failed to clean {d}", exc_info=True)
 
 
+def dumpEntries(entries):
+    from pydantic import TypeAdapter
+
+    return (
+        TypeAdapter(
+            List[
+                Union[
+                    ModuleEntry, ClassEntry, FunctionEntry, AttributeEntry, SpecialEntry
+                ]
+            ]
+        )
+        .dump_json(entries)
+        .decode()
+    )
+
+
 if __name__ == "__main__":
     initializeLogging(logging.NOTSET)
 
+    if "--shard" in sys.argv:
+        # a shard process started by mainSharded
+        shard = json.loads(sys.stdin.read())
+        sys.path.insert(0, shard["rootPath"])
+        output = dumpEntries(mainShard(shard["root"], shard["modules"]))
+        print(TRANSFER_BEGIN, end="")
+        print(output)
+        sys.exit(0)
+
+    if "--agent" in sys.argv:
+        # a long-lived agent serving commands on stdin
+        from .agent import serve
+
+        serve(mainStream)
+        sys.exit(0)
+
     dist = Distribution.model_validate_json(sys.stdin.read())
 
     assert dist.rootPath
 
-    sys.path.insert(0, str(dist.rootPath.resolve()))
+    shards = (
+        int(sys.argv[sys.argv.index("--shards") + 1]) if "--shards" in sys.argv else 1
+    )
 
-    from pydantic import TypeAdapter
+    if "--stream" in sys.argv:
+        # entries are written as records to the stream file (a named pipe) instead of stdout
+        mainStream(dist, sys.argv[sys.argv.index("--stream") + 1], shards)
+        sys.exit(0)
+
+    sys.path.insert(0, str(dist.rootPath.resolve()))
 
-    output = TypeAdapter(
-        List[
-            Union[ModuleEntry, ClassEntry, FunctionEntry, AttributeEntry, SpecialEntry]
-        ]
-    ).dump_json(main(dist))
+    if shards > 1:
+        output = json.dumps(mainSharded(dist, shards))
+    else:
+        output = dumpEntries(main(dist))
     clean(dist.rootPath)
     print(TRANSFER_BEGIN, end="")
-    print(output.decode())
+    print(output)
@@ -0,0 +1,199 @@
+"""
+Long-lived agent of the API detector in an execution environment, started by `python -m aexpy_apidetector --agent`.
+
+The agent reads a command as a JSON line on stdin, and writes the result as a JSON line on stdout
+({"returncode": ..., "stdout": ..., "stderr": ...}, like a finished process):
+- {"command": "install", "packages": [...]}: install the packages by pip.
+- {"command": "extract", "dist": ..., "stream": path, "shards": n}: detect the distribution and write the entries to the stream file.
+- {"command": "exit"}: stop the agent, so does the end of stdin.
+
+Detection runs in a process forked from the agent, so that the modules imported from a distribution do not leak into
+later detections, and the forked process does not pay for starting the interpreter and importing pydantic and the detector.
+If fork is not supported, or a preloaded package is changed by installing, detection runs in a new interpreter.
+Before forking, the agent makes packages installed after it started importable, like a new interpreter would see them.
+"""
+
+import importlib
+import json
+import os
+import site
+import subprocess
+import sys
+import tempfile
+import traceback
+from typing import Any, Callable, Dict, List, Tuple
+
+from .compat import Distribution
+
+
+def installed() -> "Dict[str, str]":
+    """Installed distributions and their versions."""
+
+    from importlib import metadata
+
+    result = {}
+    for dist in metadata.distributions():
+        name = dist.metadata["Name"]
+        if name:
+            result[name.lower().replace("_", "-")] = dist.version
+    return result
+
+
+def preloaded() -> "List[str]":
+    """Installed distributions of the modules imported by the agent, which are shared by forked detections."""
+
+    from importlib import metadata
+
+    modules = {name.partition(".")[0] for name in list(sys.modules)}
+    result = []
+    for dist in metadata.distributions():
+        name = dist.metadata["Name"]
+        if not name:
+            continue
+        tops = (dist.read_text("top_level.txt") or "").split()
+        if not tops:
+            # e.g. distributions installed without top_level.txt, by files like pkg/__init__.py or mod.py
+            tops = [file.parts[0].partition(".")[0] for file in dist.files or []]
+        if modules.intersection(tops):
+            result.append(name.lower().replace("_", "-"))
+    return result
+
+
+def siteDirectories() -> "List[str]":
+    """Site directories of the interpreter, whose .pth files are processed at startup."""
+
+    result = list(getattr(site, "getsitepackages", lambda: [])())
+    if site.ENABLE_USER_SITE:
+        result.append(site.getusersitepackages())
+    return [path for path in result if os.path.isdir(path)]
+
+
+def pthFiles() -> "List[Tuple[str, str]]":
+    return [
+        (path, name)
+        for path in siteDirectories()
+        for name in sorted(os.listdir(path))
+        if name.endswith(".pth")
+    ]
+
+
+def completed(returncode: int, stdout: str = "", stderr: str = "") -> "Dict[str, Any]":
+    return {"returncode": returncode, "stdout": stdout, "stderr": stderr}
+
+
+def pip(args: "List[str]") -> "Dict[str, Any]":
+    res = subprocess.run(
+        [sys.executable, "-m", "pip"] + args, capture_output=True, text=True
+    )
+    return completed(res.returncode, res.stdout, res.stderr)
+
+
+class Agent:
+    def __init__(self, /, detect: "Callable[[Distribution, str, int], None]"):
+        self.detect = detect
+        self.baseline = installed()
+        """Installed packages when the agent started."""
+        self.preloaded = preloaded()
+        """Packages imported by the agent, which are shared by forked detections."""
+        self.forking = hasattr(os, "fork")
+        """Whether to detect in forked processes."""
+        self.processed = set(pthFiles())
+        """Processed .pth files in the site directories."""
+
+    def refresh(self, /):
+        current = installed()
+        self.forking = hasattr(os, "fork") and all(
+            current.get(name) == self.baseline.get(name) for name in self.preloaded
+        )
+
+    def install(self, /, packages: "List[str]"):
+        result = pip(["install"] + packages)
+        self.refresh()
+        return result
+
+    def activate(self, /):
+        """Make the packages installed after the agent started importable."""
+
+        # finders cache the directory contents, and .pth files are only processed at startup (e.g. editable installs)
+        importlib.invalidate_caches()
+        for path, name in pthFiles():
+            if (path, name) not in self.processed:
+                self.processed.add((path, name))
+                site.addpackage(path, name, None)
+
+    def extract(self, /, dist: "Dict[str, Any]", stream: str, shards: int = 1):
+        if not self.forking:
+            res = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    __package__ or "aexpy_apidetector",
+                    "--stream",
+                    stream,
+                    "--shards",
+                    str(shards),
+                ],
+                input=json.dumps(dist),
+                capture_output=True,
+                text=True,
+            )
+            return completed(res.returncode, res.stdout, res.stderr)
+
+        self.activate()
+        with tempfile.TemporaryFile() as log:
+            pid = os.fork()
+            if pid == 0:
+                code = 0
+                try:
+                    # keep the protocol streams of the agent away from the detection
+                    os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+                    os.dup2(log.fileno(), 1)
+                    os.dup2(log.fileno(), 2)
+                    self.detect(Distribution.model_validate(dist), stream, shards)
+                except BaseException:
+                    traceback.print_exc()
+                    code = 1
+                finally:
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+                    os._exit(code)
+
+            _, status = os.waitpid(pid, 0)
+            log.seek(0)
+            return completed(
+                (
+                    os.WEXITSTATUS(status)
+                    if os.WIFEXITED(status)
+                    else -os.WTERMSIG(status)
+                ),
+                "",
+                log.read().decode(errors="replace"),
+            )
+
+    def handle(self, /, request: "Dict[str, Any]") -> "Dict[str, Any]":
+        command = request["command"]
+        if command == "install":
+            return self.install(request["packages"])
+        if command == "extract":
+            return self.extract(
+                request["dist"], request["stream"], request.get("shards", 1)
+            )
+        return completed(1, "", f"Unknown command: {command}")
+
+
+def serve(detect: "Callable[[Distribution, str, int], None]"):
+    agent = Agent(detect)
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break
+        request = json.loads(line)
+        if request["command"] == "exit":
+            break
+        try:
+            response = agent.handle(request)
+        except Exception:
+            response = completed(1, "", traceback.format_exc())
+        sys.stdout.write(json.dumps(response))
+        sys.stdout.write("\n")
+        sys.stdout.flush()
@@ -12,6 +12,7 @@ from .compat import (ApiEntry, AttributeEntry, ClassEntry, ClassFlag,
                      SpecialEntry, getModuleName, getObjectId, isFunction,
                      isLocal)
 from .ignores import isIgnoredMember
+from .stream import EntryStream
 
 
 def getAnnotations(obj) -> "list[tuple[str, Any]]":
@@ -53,10 +54,13 @@ class Processor:
         inspect.Parameter.POSITIONAL_OR_KEYWORD: ParameterKind.PositionalOrKeyword,
     }
 
-    def __init__(self, /):
+    def __init__(self, /, stream: "EntryStream | None" = None):
         self.mapper: "dict[str, ModuleEntry | ClassEntry | FunctionEntry | AttributeEntry | SpecialEntry]" = ({})
         self.logger = logging.getLogger("processor")
         self.abcs = buildBuiltinABCs(self.logger)
+        self.stream = stream
+        self.added: "list[ModuleEntry | ClassEntry | FunctionEntry | AttributeEntry | SpecialEntry]" = ([])
+        """Entries added but not written to the stream."""
 
     def getObjectId(self, /, obj):
         try:
@@ -75,6 +79,7 @@ class Processor:
             self.rootPath = None
 
         self.visitModule(self.root)
+        self.flush()
 
         for module in others:
             if module == root:
@@ -83,6 +88,14 @@ class Processor:
                 self.visitModule(module)
             except Exception:
                 self.logger.error(f"Failed to visit module {module}.", exc_info=True)
+            self.flush()
+
+    def flush(self, /):
+        """Write the added entries to the stream."""
+
+        if self.stream is not None:
+            self.stream.write(self.added)
+            self.added = []
 
     def allEntries(self, /):
         return list(self.mapper.values())
@@ -95,6 +108,8 @@ class Processor:
         if entry.id in self.mapper:
             raise Exception(f"Id {entry.id} has existed.")
         self.mapper[entry.id] = entry
+        if self.stream is not None:
+            self.added.append(entry)
 
     def _visitEntry(
         self,
@@ -0,0 +1,69 @@
+"""
+Streaming output of the API detector, as newline-delimited JSON records on a dedicated file (usually a named pipe).
+
+An entry record is the JSON of the entry, written when the module visit that added the entry finishes.
+Some fields of visited entries are set again when other modules reach them (MUTABLE_FIELDS),
+these changes are written at last as patch records: {"id": ..., "patch": {field: value}}.
+"""
+
+from typing import IO, Any, Dict, Iterable, Tuple
+
+from .compat import ApiEntry
+
+MUTABLE_FIELDS = ("private", "scope", "annotation")
+"""Fields set by the visitors of other modules, see Processor.visitModule and Processor.visitClass."""
+
+RELEASED_FIELDS = {"src": "", "docs": "", "comments": ""}
+"""Large fields released from written entries, the entries stay in the processor to deduplicate visits."""
+
+
+def mutableState(entry: ApiEntry) -> "Tuple[Any, ...]":
+    return tuple(getattr(entry, name, None) for name in MUTABLE_FIELDS)
+
+
+class EntryStream:
+    def __init__(self, /, file: "IO[str]"):
+        self.file = file
+        self.states: "Dict[str, Tuple[Any, ...]]" = {}
+        """Mutable fields of the written entries."""
+
+    def write(self, /, entries: "Iterable[ApiEntry]"):
+        for entry in entries:
+            self.file.write(entry.model_dump_json())
+            self.file.write("\n")
+            self.states[entry.id] = mutableState(entry)
+            for name, value in RELEASED_FIELDS.items():
+                setattr(entry, name, value)
+            entry.data = {}
+        self.file.flush()
+
+    def writeRaw(self, /, entries: "Iterable[Dict[str, Any]]"):
+        """Write entries already in JSON objects, e.g. merged from shards."""
+
+        import json
+
+        for entry in entries:
+            self.file.write(json.dumps(entry))
+            self.file.write("\n")
+        self.file.flush()
+
+    def finish(self, /, entries: "Iterable[ApiEntry]"):
+        """Write patches for the mutable fields changed after the entries were written."""
+
+        import json
+
+        for entry in entries:
+            state = self.states.get(entry.id)
+            if state is None or state == mutableState(entry):
+                continue
+            patch = entry.model_dump(
+                mode="json",
+                include={
+                    name
+                    for name, old in zip(MUTABLE_FIELDS, state)
+                    if getattr(entry, name, None) != old
+                },
+            )
+            self.file.write(json.dumps({"id": entry.id, "patch": patch}))
+            self.file.write("\n")
+        self.file.flush()
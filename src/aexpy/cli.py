@@ -1,6 +1,7 @@
 import code
 import json
 import logging
+import os
 import sys
 import zipfile
 from dataclasses import dataclass
@@ -26,6 +27,8 @@ class CliOptions:
     verbose: int = 0
     interact: bool = False
     compress: bool = False
+    zstd: bool = False
+    format: str = "json"
 
     def args(self):
         verbose = min(5, max(0, self.verbose))
@@ -33,6 +36,8 @@ class CliOptions:
             (["-" + "v" * verbose] if verbose > 0 else [])
             + (["--interact"] if self.interact else [])
             + (["--gzip"] if self.compress else [])
+            + (["--zstd"] if self.zstd else [])
+            + (["--format", self.format] if self.format != "json" else [])
         )
 
 
@@ -87,16 +92,26 @@ def StreamProductLoader(stream: IO[bytes]):
 
 
 def StreamProductSaver(
-    target: IO[bytes], logStream: IO[bytes] | None = None, gzip: bool = False
+    target: IO[bytes],
+    logStream: IO[bytes] | None = None,
+    gzip: bool = False,
+    format: str = "json",
+    zstd: bool = False,
 ):
-    if gzip:
+    if zstd:
+        from .io import ProductFormat
+        from .io.zstd import ZstdStreamProductSaver
+
+        return ZstdStreamProductSaver(target, logStream, cast(ProductFormat, format))
+    elif gzip:
+        from .io import ProductFormat
         from .io.gzip import GzipStreamProductSaver
 
-        return GzipStreamProductSaver(target, logStream)
+        return GzipStreamProductSaver(target, logStream, cast(ProductFormat, format))
     else:
-        from .io import StreamProductSaver
+        from .io import ProductFormat, StreamProductSaver
 
-        return StreamProductSaver(target, logStream)
+        return StreamProductSaver(target, logStream, cast(ProductFormat, format))
 
 
 def exitWithContext[T: Product](context: ProduceContext[T]):
@@ -149,11 +164,36 @@ def versionMessage():
     envvar="AEXPY_GZIP_IO",
     help="Gzip for IO.",
 )
+@click.option(
+    "--zstd/--no-zstd",
+    is_flag=True,
+    default=False,
+    envvar="AEXPY_ZSTD_IO",
+    help="Zstandard for IO (multithreaded, preferred over gzip).",
+)
+@click.option(
+    "--zstd-dict",
+    "zstdDict",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, path_type=Path),
+    default=None,
+    envvar="AEXPY_ZSTD_DICT",
+    help="Zstandard dictionary for IO, see `aexpy zstd-dict`.",
+)
+@click.option(
+    "--format",
+    type=click.Choice(["json", "indexed"]),
+    default="json",
+    envvar="AEXPY_FORMAT_IO",
+    help="Output format: json, or indexed (random-access API descriptions). Input is auto-detected.",
+)
 def main(
     ctx: click.Context,
     verbose: int = 0,
     interact: bool = False,
     gzip: bool = False,
+    zstd: bool = False,
+    zstdDict: Path | None = None,
+    format: str = "json",
     service: IO[str] | None = None,
 ) -> None:
     """
@@ -168,6 +208,11 @@ def main(
     clictx.verbose = verbose
     clictx.interact = interact
     clictx.compress = gzip
+    clictx.zstd = zstd
+    if zstdDict is not None:
+        # read by aexpy.io.zstd, and inherited by subprocesses
+        os.environ["AEXPY_ZSTD_DICT"] = str(zstdDict.resolve())
+    clictx.format = format
 
     loggingLevel = {
         0: logging.CRITICAL,
@@ -399,7 +444,9 @@ def preprocess(
     )
 
     result = context.product
-    StreamProductSaver(distribution, gzip=clictx.compress).save(result, context.log)
+    StreamProductSaver(
+        distribution, gzip=clictx.compress, format=clictx.format, zstd=clictx.zstd
+    ).save(result, context.log)
 
     print(result.overview(), file=sys.stderr)
     if clictx.interact:
@@ -448,6 +495,20 @@ def preprocess(
     default="",
     help="Wheel file name, required when using wheel mode and reading file content from stdin.",
 )
+@click.option(
+    "-S",
+    "--shards",
+    type=click.IntRange(min=1),
+    default=None,
+    envvar="AEXPY_DETECT_SHARDS",
+    help="Number of shards of submodules to import and inspect in separate processes, for large packages.",
+)
+@click.option(
+    "--agent/--no-agent",
+    default=None,
+    envvar="AEXPY_DETECT_AGENT",
+    help="Install and detect through a long-lived agent process in the environment (default).",
+)
 def extract(
     ctx: click.Context,
     distribution: IO[bytes],
@@ -458,6 +519,8 @@ def extract(
         Literal["json"] | Literal["src"] | Literal["wheel"] | Literal["release"]
     ) = "json",
     wheelName: str = "",
+    shards: int | None = None,
+    agent: bool | None = None,
 ):
     """Extract the API in a distribution.
 
@@ -486,9 +549,17 @@ def extract(
     cat ./temp/aexpy-0.1.0.whl | aexpy extract - api.json -w --wheel-name aexpy-0.1.0
 
     zip -r - ./aexpy | aexpy extract - api.json -s
+
+    aexpy extract -S 4 ./distribution.json ./api.json
     """
     clictx = ctx.ensure_object(CliContext)
 
+    if shards is not None:
+        # read by the base extractor
+        os.environ["AEXPY_DETECT_SHARDS"] = str(shards)
+    if agent is not None:
+        os.environ["AEXPY_DETECT_AGENT"] = "1" if agent else "0"
+
     if mode == "json":
         data = StreamProductLoader(distribution).load(Distribution)
         context = extractCore(service=clictx.service, data=data, env=env, temp=temp)
@@ -543,7 +614,9 @@ def extract(
 
     result = context.product
 
-    StreamProductSaver(description, gzip=clictx.compress).save(result, context.log)
+    StreamProductSaver(
+        description, gzip=clictx.compress, format=clictx.format, zstd=clictx.zstd
+    ).save(result, context.log)
 
     print(result.overview(), file=sys.stderr)
 
@@ -558,7 +631,28 @@ def extract(
 @click.argument("old", type=click.File("rb"))
 @click.argument("new", type=click.File("rb"))
 @click.argument("difference", type=click.File("wb"))
-def diff(ctx: click.Context, old: IO[bytes], new: IO[bytes], difference: IO[bytes]):
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    envvar="AEXPY_DIFF_WORKERS",
+    help="Number of worker processes to diff in parallel.",
+)
+@click.option(
+    "--slim/--no-slim",
+    default=False,
+    envvar="AEXPY_SLIM_DIFF",
+    help="Refer to API entries by ids only, resolve them from the API descriptions when viewing.",
+)
+def diff(
+    ctx: click.Context,
+    old: IO[bytes],
+    new: IO[bytes],
+    difference: IO[bytes],
+    workers: int | None = None,
+    slim: bool = False,
+):
     """Diff the API descriptions and find all changes.
 
     OLD describes the input API description file of the old distribution (in json format, use `-` for stdin).
@@ -574,9 +668,17 @@ def diff(ctx: click.Context, old: IO[bytes], new: IO[bytes], difference: IO[byte
     aexpy diff ./api1.json ./api2.json ./changes.json
 
     echo "," | cat ./api1.json - ./api2.json | aexpy diff - - ./changes.json
+
+    aexpy diff -w 8 ./api1.json ./api2.json ./changes.json
+
+    aexpy diff --slim ./api1.json ./api2.json ./changes.json
     """
     clictx = ctx.ensure_object(CliContext)
 
+    if workers is not None:
+        # read by the constraint differ
+        os.environ["AEXPY_DIFF_WORKERS"] = str(workers)
+
     if old.name == sys.stdin.name and new.name == sys.stdin.name:
         try:
             oldDataDict, newDataDict = json.loads(f"[{old.read().decode()}]")
@@ -593,7 +695,9 @@ def diff(ctx: click.Context, old: IO[bytes], new: IO[bytes], difference: IO[byte
     context = clictx.service.diff(oldData, newData)
 
     result = context.product
-    StreamProductSaver(difference, gzip=clictx.compress).save(result, context.log)
+    StreamProductSaver(
+        difference, gzip=clictx.compress, format=clictx.format, zstd=clictx.zstd
+    ).save(result.slim() if slim else result, context.log)
 
     print(result.overview(), file=sys.stderr)
 
@@ -603,6 +707,82 @@ def diff(ctx: click.Context, old: IO[bytes], new: IO[bytes], difference: IO[byte
     exitWithContext(context=context)
 
 
+@main.command("diff-series")
+@click.pass_context
+@click.argument(
+    "descriptions",
+    nargs=-1,
+    required=True,
+    type=click.Path(
+        exists=True, dir_okay=False, file_okay=True, resolve_path=True, path_type=Path
+    ),
+)
+@click.argument(
+    "output",
+    type=click.Path(dir_okay=True, file_okay=False, resolve_path=True, path_type=Path),
+)
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of worker processes to diff adjacent pairs in parallel.",
+)
+@click.option(
+    "--slim/--no-slim",
+    default=False,
+    envvar="AEXPY_SLIM_DIFF",
+    help="Refer to API entries by ids only, resolve them from the API descriptions when viewing.",
+)
+def diffSeries(
+    ctx: click.Context,
+    descriptions: tuple[Path],
+    output: Path,
+    workers: int = 1,
+    slim: bool = False,
+):
+    """Diff each pair of adjacent API descriptions in a release series.
+
+    DESCRIPTIONS give paths to the API description files, ordered by release.
+
+    OUTPUT describes the output directory, each API difference is saved as `OLD&NEW.json` by the file stems of the pair.
+
+    Each description is loaded once, and only a sliding window of descriptions is kept in memory.
+
+    Examples:
+
+    aexpy diff-series ./api1.json ./api2.json ./api3.json ./changes
+
+    aexpy diff-series -w 4 ./apis/*.json ./changes
+    """
+    from .io import load
+    from .utils import ensureDirectory
+
+    clictx = ctx.ensure_object(CliContext)
+
+    ensureDirectory(output)
+    contexts = clictx.service.diffSeries(
+        (load(path, ApiDescription) for path in descriptions), workers=workers
+    )
+
+    failed = 0
+    for (old, new), context in zip(zip(descriptions, descriptions[1:]), contexts):
+        result = context.product
+        with (output / f"{old.stem}&{new.stem}.json").open("wb") as f:
+            StreamProductSaver(
+                f, gzip=clictx.compress, format=clictx.format, zstd=clictx.zstd
+            ).save(result.slim() if slim else result, context.log)
+        print(result.overview(), file=sys.stderr)
+        if result.state != ProduceState.Success:
+            print(f"Failed to process: {context.exception}", file=sys.stderr)
+            failed += 1
+
+    if clictx.interact:
+        code.interact(banner="", local=locals())
+
+    exit(1 if failed else 0)
+
+
 @main.command()
 @click.pass_context
 @click.argument("difference", type=click.File("rb"))
@@ -625,7 +805,9 @@ def report(ctx: click.Context, difference: IO[bytes], report: IO[bytes]):
     context = clictx.service.report(data)
 
     result = context.product
-    StreamProductSaver(report, gzip=clictx.compress).save(result, context.log)
+    StreamProductSaver(
+        report, gzip=clictx.compress, format=clictx.format, zstd=clictx.zstd
+    ).save(result, context.log)
 
     print(result.overview(), file=sys.stderr)
     print(f"\n{result.content}", file=sys.stderr)
@@ -639,17 +821,39 @@ def report(ctx: click.Context, difference: IO[bytes], report: IO[bytes]):
 @main.command()
 @click.pass_context
 @click.argument("file", type=click.File("rb"))
-def view(ctx: click.Context, file: IO[bytes]):
+@click.option(
+    "--old",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, path_type=Path),
+    default=None,
+    help="Old API description, to resolve entries of a slim API difference.",
+)
+@click.option(
+    "--new",
+    type=click.Path(exists=True, dir_okay=False, file_okay=True, path_type=Path),
+    default=None,
+    help="New API description, to resolve entries of a slim API difference.",
+)
+def view(
+    ctx: click.Context,
+    file: IO[bytes],
+    old: Path | None = None,
+    new: Path | None = None,
+):
     """View produced data.
 
     Supports distribution, api-description, api-difference, report and  file (in json format).
+
+    Indexed API descriptions (`--format indexed`) given by path are memory-mapped and only decode the entries in use.
+
+    Slim API differences (`diff --slim`) resolve their entries from the descriptions given by `--old` and `--new`.
     """
     clictx = ctx.ensure_object(CliContext)
 
-    cache = StreamProductLoader(file)
-
     from .io import load
 
+    path = Path(str(getattr(file, "name", "")))
+    source = path if path.is_file() else StreamProductLoader(file).raw()
+
     try:
         from .tools.stats import StatSummary
 
@@ -657,7 +861,9 @@ def view(ctx: click.Context, file: IO[bytes]):
     except Exception:
         fallback = None
 
-    result = load(cache.raw(), fallback)
+    result = load(source, fallback)
+    if isinstance(result, ApiDifference) and old is not None and new is not None:
+        result.attach(load(old, ApiDescription), load(new, ApiDescription))
 
     print(result.overview())
     if isinstance(result, Report):
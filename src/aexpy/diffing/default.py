@@ -18,4 +18,6 @@ class DefaultDiffer(Differ):
             with context.using(DefaultEvaluator()) as producer:
                 producer.diff(old, new, product)
 
+            product.collectTypePayloads(old, new)
+
             self.name = context.combinedProducers(self)
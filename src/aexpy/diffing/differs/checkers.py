@@ -1,5 +1,7 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from typing import Callable, Iterable, Literal, Type, cast, overload
+from typing import Any, Callable, Iterable, Literal, Type, cast, overload
 
 from ...models import ApiDescription, DiffEntry
 from ...models.description import ApiEntry
@@ -10,6 +12,45 @@ type T_Checker = Callable[
 ]
 
 
+@dataclass
+class DiffContext:
+    """Context of an entry pair, shared by all constraints to reuse data computed from the pair."""
+
+    old: ApiEntry | None = None
+    new: ApiEntry | None = None
+    cache: dict[str, Any] = field(default_factory=dict)
+
+    def cached[T](self, /, key: str, factory: Callable[[], T]) -> T:
+        if key not in self.cache:
+            self.cache[key] = factory()
+        return self.cache[key]
+
+
+_currentContext: ContextVar[DiffContext | None] = ContextVar(
+    "diffContext", default=None
+)
+
+
+@contextmanager
+def pairContext(old: ApiEntry | None, new: ApiEntry | None):
+    """Share a context among the constraints called for the entry pair."""
+
+    token = _currentContext.set(DiffContext(old, new))
+    try:
+        yield
+    finally:
+        _currentContext.reset(token)
+
+
+def diffContext(old: ApiEntry | None, new: ApiEntry | None):
+    """Return the shared context of the entry pair, or a new one if not in the pair context (e.g. calling a constraint directly)."""
+
+    context = _currentContext.get()
+    if context is not None and context.old is old and context.new is new:
+        return context
+    return DiffContext(old, new)
+
+
 class DiffConstraint:
     """
     A contraint (checker) generating DiffEntry.
@@ -27,6 +68,8 @@ class DiffConstraint:
             checker if checker else cast(T_Checker, lambda a, b, old, new: [])
         )
         self.kind = kind
+        self.filters: list[tuple[Type, bool]] = []
+        """Type limits (type, optional) added by fortype, used to dispatch by entry types."""
 
     def askind(self, /, kind: str):
         """Set kind."""
@@ -53,8 +96,19 @@ class DiffConstraint:
             return []
 
         self.checker = cast(T_Checker, checker)
+        self.filters.append((type, optional))
         return self
 
+    def accepts(self, /, old: type | None, new: type | None):
+        """Whether the constraint may produce entries for an entry pair of the types (None for missing entries)."""
+
+        for type, optional in self.filters:
+            oldMatch = old is not None and issubclass(old, type)
+            newMatch = new is not None and issubclass(new, type)
+            if not (oldMatch or newMatch if optional else oldMatch and newMatch):
+                return False
+        return True
+
     def __call__(
         self,
         /,
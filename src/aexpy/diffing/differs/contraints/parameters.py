@@ -6,7 +6,7 @@ from typing import Callable, Iterable, Iterator
 from ....models import ApiDescription
 from ....models.description import FunctionEntry, Parameter, ParameterKind
 from ....models.difference import DiffEntry
-from ..checkers import DiffConstraintCollection, typedCons
+from ..checkers import DiffConstraintCollection, diffContext, typedCons
 
 ParameterConstraints = DiffConstraintCollection()
 
@@ -66,7 +66,10 @@ def changeParameter(
     def wrapper(
         a: FunctionEntry, b: FunctionEntry, old: ApiDescription, new: ApiDescription
     ):
-        for x, y in matchParameters(a, b):
+        pairs = diffContext(a, b).cached(
+            "matchParameters", lambda: list(matchParameters(a, b))
+        )
+        for x, y in pairs:
             for item in checker(x, y, a, b):
                 item.data["old"] = x.name if x else ""
                 item.data["new"] = y.name if y else ""
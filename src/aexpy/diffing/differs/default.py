@@ -1,14 +1,16 @@
+import multiprocessing
+import os
 from hashlib import blake2b
 from logging import Logger
 from typing import Iterable, override
 from uuid import uuid1
 
-from ...models import ApiDescription
-from ...models.description import ApiEntry
+from ...models import ApiDescription, ApiDifference
+from ...models.description import ApiEntry, CollectionEntry
 from ...models.difference import DiffEntry
 from ...utils import isLocal
 from .. import Differ
-from .checkers import DiffConstraint
+from .checkers import DiffConstraint, pairContext
 
 
 def hashDiffEntry(entry: DiffEntry):
@@ -17,6 +19,23 @@ def hashDiffEntry(entry: DiffEntry):
     ).hexdigest()
 
 
+WORKERS_ENV = "AEXPY_DIFF_WORKERS"
+
+MIN_PARALLEL_PAIRS = 1000
+"""Diff serially for fewer pairs, where forking costs more than it saves."""
+
+SHARDS_PER_WORKER = 4
+
+_shared: "tuple[ConstraintDiffer, ApiDescription, ApiDescription] | None" = None
+"""Differ and descriptions shared with forked workers."""
+
+
+def _processShard(shard: list[tuple[str | None, str | None]]):
+    assert _shared is not None, "No shared differ in worker."
+    differ, old, new = _shared
+    return [list(differ.processPair(pair, old, new)) for pair in shard]
+
+
 class ConstraintDiffer(Differ):
     """Diff based on diff constraints."""
 
@@ -25,20 +44,118 @@ class ConstraintDiffer(Differ):
         /,
         logger: Logger | None = None,
         constraints: list[DiffConstraint] | None = None,
+        workers: int | None = None,
+        skipUnchanged: bool = True,
     ) -> None:
         super().__init__(logger)
+        self.skipUnchanged = skipUnchanged
+        """Skip pairs with the same fingerprint, assuming constraints produce nothing for them."""
         self.constraints: list[DiffConstraint] = constraints or []
+        self.workers = (
+            workers if workers is not None else int(os.getenv(WORKERS_ENV) or 1)
+        )
+        """Number of worker processes to diff in parallel, default to AEXPY_DIFF_WORKERS."""
+        self.dispatchTable: dict[
+            tuple[type | None, type | None], list[DiffConstraint]
+        ] = {}
+        self.dispatchKey: tuple[list[DiffConstraint] | None, int] = (None, 0)
+        """The constraints list and its size when the dispatch table was built."""
 
-    @override
-    def diff(self, /, old, new, product):
+    def dispatch(self, /, old: ApiEntry | None, new: ApiEntry | None):
+        """Return the constraints applicable to the entry pair, bucketed by the entry types."""
+
+        if self.dispatchKey[0] is not self.constraints or self.dispatchKey[1] != len(
+            self.constraints
+        ):
+            self.dispatchTable = {}
+            self.dispatchKey = self.constraints, len(self.constraints)
+        types = (
+            old.__class__ if old is not None else None,
+            new.__class__ if new is not None else None,
+        )
+        result = self.dispatchTable.get(types)
+        if result is None:
+            result = self.dispatchTable[types] = [
+                constraint
+                for constraint in self.constraints
+                if constraint.accepts(*types)
+            ]
+        return result
+
+    def pairs(self, /, old: ApiDescription, new: ApiDescription):
+        """Ids of the entry pairs to diff, entries only in the new description are paired with None at last."""
+
+        result: list[tuple[str | None, str | None]] = []
+        unchanged = self.unchanged(old, new) if self.skipUnchanged else set()
         for v in old:
             if isLocal(v.id):
                 # ignore unaccessable local elements
                 continue
+            if v.id in unchanged:
+                continue
             newentry = new[v.id]
             if newentry is not None and isLocal(newentry.id):
                 continue
-            for e in self.process(v, newentry, old, new):
+            result.append((v.id, newentry.id if newentry is not None else None))
+
+        for v in new:
+            if isLocal(v.id):
+                # ignore unaccessable local elements
+                continue
+            if v.id not in old:
+                result.append((None, v.id))
+        return result
+
+    def unchanged(self, /, old: ApiDescription, new: ApiDescription):
+        """Ids of the entries unchanged by fingerprint, including whole unchanged subtrees of collections."""
+
+        result: set[str] = set()
+        subtrees = 0
+        for v in old:
+            if v.id in result or v.id not in new:
+                continue
+            if isinstance(v, CollectionEntry) and old.treeFingerprint(
+                v.id
+            ) == new.treeFingerprint(v.id):
+                result.add(v.id)
+                result.update(old.descendants(v.id))
+                subtrees += 1
+            elif old.fingerprint(v.id) == new.fingerprint(v.id):
+                result.add(v.id)
+        self.logger.info(
+            f"Skip {len(result)} unchanged entries ({subtrees} unchanged subtrees)."
+        )
+        return result
+
+    def processPair(
+        self,
+        /,
+        pair: tuple[str | None, str | None],
+        old: ApiDescription,
+        new: ApiDescription,
+    ):
+        oldId, newId = pair
+        return self.process(
+            old[oldId] if oldId is not None else None,
+            new[newId] if newId is not None else None,
+            old,
+            new,
+        )
+
+    def merge(
+        self,
+        /,
+        product: ApiDifference,
+        pairs: list[tuple[str | None, str | None]],
+        results: Iterable[Iterable[DiffEntry]],
+    ):
+        """Add the diff entries of the pairs to the product in pair order."""
+
+        for (oldId, _), entries in zip(pairs, results, strict=True):
+            for e in entries:
+                if oldId is None:
+                    product.entries[e.id] = e
+                    continue
                 if e.id in product.entries:
                     self.logger.warning(f"Existed entry id  {e.id}: {e}")
                     e.id += f"-{uuid1()}"
@@ -47,14 +164,47 @@ class ConstraintDiffer(Differ):
                     ), f"Still existed entry id {e.id}: {e}"
                 product.entries[e.id] = e
 
-        for v in new:
-            if isLocal(v.id):
-                # ignore unaccessable local elements
-                continue
-            if v.id not in old:
-                product.entries.update(
-                    {e.id: e for e in self.process(None, v, old, new)}
-                )
+    @override
+    def diff(self, /, old, new, product):
+        pairs = self.pairs(old, new)
+        parallel = self.workers > 1 and len(pairs) >= MIN_PARALLEL_PAIRS
+        if parallel and "fork" not in multiprocessing.get_all_start_methods():
+            self.logger.warning("Parallel diff requires fork, diff serially.")
+            parallel = False
+        if parallel:
+            results = self.parallel(pairs, old, new)
+        else:
+            results = (self.processPair(pair, old, new) for pair in pairs)
+        self.merge(product, pairs, results)
+
+    def parallel(
+        self,
+        /,
+        pairs: list[tuple[str | None, str | None]],
+        old: ApiDescription,
+        new: ApiDescription,
+    ):
+        """Diff the pairs in a forked process pool, sharing the differ and descriptions with workers."""
+
+        global _shared
+
+        # contiguous shards keep entries of the same module together and results in pair order
+        size = max(1, -(-len(pairs) // (self.workers * SHARDS_PER_WORKER)))
+        shards = [pairs[i : i + size] for i in range(0, len(pairs), size)]
+        self.logger.info(
+            f"Diff {len(pairs)} pairs in {len(shards)} shards by {self.workers} workers."
+        )
+
+        _shared = self, old, new
+        try:
+            with multiprocessing.get_context("fork").Pool(self.workers) as pool:
+                return [
+                    entries
+                    for shard in pool.imap(_processShard, shards)
+                    for entries in shard
+                ]
+        finally:
+            _shared = None
 
     def process(
         self,
@@ -65,17 +215,20 @@ class ConstraintDiffer(Differ):
         newDescription: ApiDescription,
     ) -> Iterable[DiffEntry]:
         self.logger.debug(f"Diff {old} and {new}.")
-        for constraint in self.constraints:
-            try:
-                for item in constraint(old, new, oldDescription, newDescription):
-                    if not item.id:
-                        item.id = hashDiffEntry(item)
-                    yield item
-            except Exception:
-                self.logger.error(
-                    f"Failed to diff {old} and {new} by constraints {constraint.kind} ({constraint.checker}).",
-                    exc_info=True,
-                )
+        result: list[DiffEntry] = []
+        with pairContext(old, new):
+            for constraint in self.dispatch(old, new):
+                try:
+                    for item in constraint(old, new, oldDescription, newDescription):
+                        if not item.id:
+                            item.id = hashDiffEntry(item)
+                        result.append(item)
+                except Exception:
+                    self.logger.error(
+                        f"Failed to diff {old} and {new} by constraints {constraint.kind} ({constraint.checker}).",
+                        exc_info=True,
+                    )
+        return result
 
 
 class DefaultDiffer(ConstraintDiffer):
@@ -84,6 +237,8 @@ class DefaultDiffer(ConstraintDiffer):
         /,
         logger: Logger | None = None,
         constraints: list[DiffConstraint] | None = None,
+        workers: int | None = None,
+        skipUnchanged: bool = True,
     ) -> None:
         constraints = constraints or []
 
@@ -99,7 +254,7 @@ class DefaultDiffer(ConstraintDiffer):
         constraints.extend(aliases.AliasConstraints.constraints)
         constraints.extend(externals.ExternalConstraints.constraints)
 
-        super().__init__(logger, constraints)
+        super().__init__(logger, constraints, workers, skipUnchanged)
 
     @override
     def process(self, /, old, new, oldDescription, newDescription):
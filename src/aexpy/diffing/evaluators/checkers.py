@@ -44,6 +44,15 @@ class EvalRule:
         return self.checker(entry, diff, old, new)
 
 
+@dataclass
+class RuleTiming:
+    """Timing counters of a rule in an evaluator."""
+
+    calls: int = 0
+    elapsed: float = 0
+    """Total seconds spent in the rule."""
+
+
 @dataclass
 class EvalRuleCollection:
     """Collection for rule evaluators."""
@@ -1,38 +1,98 @@
+from bisect import bisect_right
 from logging import Logger
+from time import perf_counter
 from typing import override
 
+from ...models import DiffEntry
 from .. import Differ
-from .checkers import EvalRule
+from .checkers import EvalRule, RuleTiming
 
 
 class RuleEvaluator(Differ):
     """Evaluator based on rules."""
 
     def __init__(
-        self, /, logger: Logger | None = None, rules: list[EvalRule] | None = None
+        self,
+        /,
+        logger: Logger | None = None,
+        rules: list[EvalRule] | None = None,
+        timing: bool = False,
     ) -> None:
         super().__init__(logger)
         self.rules = rules or []
+        self.timing = timing
+        """Count calls and time of each rule in timings."""
+        self.timings: dict[EvalRule, RuleTiming] = {}
+        self.kindRules: dict[str, list[int]] = {}
+        """Positions of the rules for each kind, merged with the rules for all kinds."""
+        self.allKindRules: list[int] = []
+        """Positions of the rules for all kinds."""
+        self.reindex()
+
+    def reindex(self, /):
+        """Index the rules by kind, call it after changing rules or their kinds."""
+
+        self.allKindRules = [i for i, rule in enumerate(self.rules) if not rule.kind]
+        self.kindRules = {}
+        for i, rule in enumerate(self.rules):
+            if rule.kind:
+                self.kindRules.setdefault(rule.kind, []).append(i)
+        for kind, positions in self.kindRules.items():
+            self.kindRules[kind] = sorted(positions + self.allKindRules)
+        self.timings = {rule: RuleTiming() for rule in self.rules}
+
+    def evaluate(self, /, entry: DiffEntry, product, old, new):
+        """Run the rules for the entry in order. Rules may change the kind, then the later rules for the new kind run."""
+
+        last = -1
+        while True:
+            positions = self.kindRules.get(entry.kind, self.allKindRules)
+            index = bisect_right(positions, last)
+            if index == len(positions):
+                break
+            last = positions[index]
+            rule = self.rules[last]
+            try:
+                if self.timing:
+                    start = perf_counter()
+                    rule(entry, product, old, new)
+                    timing = self.timings[rule]
+                    timing.calls += 1
+                    timing.elapsed += perf_counter() - start
+                else:
+                    rule(entry, product, old, new)
+            except Exception:
+                self.logger.error(
+                    f"Failed to evaluate entry {entry.id} ({entry.message}) by rule {rule.kind} ({rule.checker}).",
+                    exc_info=True,
+                )
 
     @override
     def diff(self, /, old, new, product):
         for entry in product.entries.values():
             self.logger.debug(f"Evaluate entry {entry.id}: {entry.message}.")
+            self.evaluate(entry, product, old, new)
+            product.entries.update({entry.id: entry})
+        # rules change kinds and ranks in place
+        product.clearIndex()
 
-            for rule in self.rules:
-                try:
-                    rule(entry, product, old, new)
-                except Exception:
-                    self.logger.error(
-                        f"Failed to evaluate entry {entry.id} ({entry.message}) by rule {rule.kind} ({rule.checker}).",
-                        exc_info=True,
+        if self.timing:
+            for rule, timing in sorted(
+                self.timings.items(), key=lambda x: x[1].elapsed, reverse=True
+            ):
+                if timing.calls:
+                    self.logger.debug(
+                        f"Rule {rule.kind or '*'} ({rule.checker.__name__}): {timing.calls} calls, {timing.elapsed:.6f}s."
                     )
-            product.entries.update({entry.id: entry})
 
 
 class DefaultEvaluator(RuleEvaluator):
     def __init__(
-        self, /, logger: Logger | None = None, rules: list[EvalRule] | None = None
+        self,
+        /,
+        logger: Logger | None = None,
+        rules: list[EvalRule] | None = None,
+        timing: bool = False,
     ) -> None:
         rules = rules or []
 
@@ -40,4 +100,4 @@ class DefaultEvaluator(RuleEvaluator):
 
         rules.extend(RuleEvals.rules)
 
-        super().__init__(logger, rules)
+        super().__init__(logger, rules, timing)
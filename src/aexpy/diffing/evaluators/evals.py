@@ -353,7 +353,7 @@ def ChangeAttributeType(
     assert isinstance(eold, AttributeEntry) and isinstance(enew, AttributeEntry)
     assert eold.type is not None and enew.type is not None
 
-    result = ApiTypeCompatibilityChecker(new).isCompatibleTo(enew.type, eold.type)
+    result = ApiTypeCompatibilityChecker.of(new).isCompatibleTo(enew.type, eold.type)
     if result == True:
         entry.rank = BreakingRank.Compatible
     elif result == False:
@@ -381,7 +381,7 @@ def ChangeReturnType(
     if isinstance(told, NoneType):
         told = TypeFactory.any()
 
-    result = ApiTypeCompatibilityChecker(new).isCompatibleTo(enew.returnType, told)
+    result = ApiTypeCompatibilityChecker.of(new).isCompatibleTo(enew.returnType, told)
     if result == True:
         entry.rank = BreakingRank.Compatible
     elif result == False:
@@ -409,14 +409,14 @@ def ChangeParameterType(
     assert pold is not None and pold.type is not None
     assert pnew is not None and pnew.type is not None
 
-    tnew = pnew.type.model_copy(deep=True)
+    tnew = pnew.type
 
     if isinstance(tnew, CallableType):
         if isinstance(tnew.ret, NoneType):
             # a parameter: any -> none, is same as any -> any (ignore return means return any thing is ok)
-            tnew.ret = TypeFactory.any()
+            tnew = tnew.model_copy(update={"ret": TypeFactory.any()})
 
-    result = ApiTypeCompatibilityChecker(new).isCompatibleTo(pold.type, tnew)
+    result = ApiTypeCompatibilityChecker.of(new).isCompatibleTo(pold.type, tnew)
 
     if result == True:
         entry.rank = BreakingRank.Compatible
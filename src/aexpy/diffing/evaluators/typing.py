@@ -4,11 +4,17 @@ from ...models import ApiDescription
 from ...models.description import ClassEntry
 from ...models.typing import (AnyType, CallableType, ClassType, GenericType,
                               LiteralType, NoneType, ProductType, SumType,
-                              Type, TypeFactory, UnknownType)
+                              Type, TypeFactory, TypeTable, UnknownType)
 from ...utils import getObjectId
 
 
 class TypeCompatibilityChecker:
+    def __init__(self, /, types: TypeTable | None = None) -> None:
+        self.types = types if types is not None else TypeTable()
+        """Table of interned types, checks of interned types are memoized, so that structurally equal types share memo results."""
+        self.memo: dict[tuple[int, int], bool | None] = {}
+        """Results by the indices of the type pair in the type table."""
+
     def isSubclass(self, /, a: ClassType, b: ClassType) -> bool:
         return a.id == b.id or b.id == getObjectId(object)
 
@@ -137,6 +143,19 @@ class TypeCompatibilityChecker:
 
     def isCompatibleTo(self, /, a: Type, b: Type) -> bool | None:
         """Return type class a is a subset of type class b, indicating that instance of a can be assign to variable of b."""
+        ia, ib = self.types.find(a), self.types.find(b)
+        if ia is None or ib is None:
+            # keying types not interned costs more than comparing them, which stops at the first difference
+            return self.compare(a, b)
+        key = ia, ib
+        if key in self.memo:
+            return self.memo[key]
+        # children of interned types are interned, so that nested checks are memoized too
+        result = self.memo[key] = self.compare(a, b)
+        return result
+
+    def compare(self, /, a: Type, b: Type) -> bool | None:
+        """Check compatibility without memo, see `isCompatibleTo`."""
         match a:
             case ClassType():
                 return self.isClassCompatibleTo(a, b)
@@ -162,13 +181,43 @@ class TypeCompatibilityChecker:
 
 class ApiTypeCompatibilityChecker(TypeCompatibilityChecker):
     def __init__(self, /, api: ApiDescription) -> None:
-        super().__init__()
+        super().__init__(api.typeTable())
         self.api = api
+        self.size = len(api)
+        """Number of entries when the checker was created, to detect changed descriptions."""
+        self.ancestorSets: dict[str, frozenset[str]] = {}
+        """Cache for ancestors (bases, abcs and mros) of classes."""
+
+    @classmethod
+    def of(cls, /, api: ApiDescription):
+        """
+        Return the checker of the description, kept on the description and reused (with its memo) until the description changes.
+
+        Types of extracted and loaded descriptions are interned, call `ApiDescription.internTypes` first to memoize checks of types in descriptions built otherwise.
+        """
+
+        checker = api._typeChecker
+        if (
+            not isinstance(checker, cls)
+            or checker.api is not api
+            or checker.size != len(api)
+        ):
+            checker = api._typeChecker = cls(api)
+        return checker
+
+    def ancestors(self, /, id: str):
+        result = self.ancestorSets.get(id)
+        if result is None:
+            entry = self.api[id]
+            if isinstance(entry, ClassEntry):
+                result = frozenset(entry.bases) | frozenset(entry.abcs)
+                result |= frozenset(entry.mros)
+            else:
+                result = frozenset()
+            self.ancestorSets[id] = result
+        return result
 
     def isSubclass(self, /, a: ClassType, b: ClassType) -> bool:
         if super().isSubclass(a, b):
             return True
-        ea = self.api[a.id]
-        if not isinstance(ea, ClassEntry):
-            return False
-        return b.id in ea.bases or b.id in ea.abcs or b.id in ea.mros
+        return b.id in self.ancestors(a.id)
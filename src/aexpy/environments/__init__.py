@@ -3,7 +3,7 @@ import subprocess
 import sys
 from abc import ABC, abstractmethod
 from contextlib import contextmanager
-from typing import override
+from typing import Callable, override
 
 
 class ExecutionEnvironmentRunner:
@@ -60,6 +60,27 @@ class ExecutionEnvironmentRunner:
             shell=True,
         )
 
+    def startPython(self, /, command: str, **kwargs) -> subprocess.Popen[str]:
+        """Start a long-lived python process in the environment."""
+
+        return subprocess.Popen(
+            f"{self.commandPrefix} {self.pythonName} {command}".strip(),
+            **kwargs,
+            **self.options,
+            text=True,
+            shell=True,
+        )
+
+
+_releaseHooks: list[Callable[[ExecutionEnvironmentRunner], None]] = []
+
+
+def onRelease(hook: Callable[[ExecutionEnvironmentRunner], None]):
+    """Register a hook called with the runner of an environment before the environment is reset or removed, e.g. to stop processes started in it."""
+
+    _releaseHooks.append(hook)
+    return hook
+
 
 class ExecutionEnvironment:
     """Environment that runs extractor code."""
@@ -78,10 +99,23 @@ class ExecutionEnvironment:
     def __exit__(self, /, exc_type, exc_val, exc_tb):
         self.logger.debug(f"Exit the environment: {self=}")
 
+    def release(self, /):
+        """Run the release hooks (see onRelease) for the environment."""
+
+        runner = self.runner()
+        for hook in _releaseHooks:
+            try:
+                hook(runner)
+            except Exception:
+                self.logger.error(f"Failed to release env {self=}", exc_info=True)
+
 
 class ExecutionEnvironmentBuilder[T: ExecutionEnvironment](ABC):
     """Builder to create environment that runs extractor code."""
 
+    supportsClone: bool = False
+    """Whether the builder implements clone."""
+
     def __init__(self, /, logger: logging.Logger | None = None) -> None:
         self.logger = logger or logging.getLogger("exe-env-builder")
 
@@ -93,6 +127,11 @@ class ExecutionEnvironmentBuilder[T: ExecutionEnvironment](ABC):
     @abstractmethod
     def clean(self, /, env: T): ...
 
+    def clone(self, /, env: T, logger: logging.Logger | None = None) -> T:
+        """Create a new environment as a copy of the environment, if supportsClone."""
+
+        raise NotImplementedError(f"{type(self).__name__} does not support cloning.")
+
     @contextmanager
     def use(self, /, pyversion: str = "3.12", logger: logging.Logger | None = None):
         logger = logger or self.logger.getChild("sub-env")
@@ -114,6 +153,7 @@ class ExecutionEnvironmentBuilder[T: ExecutionEnvironment](ABC):
             self.logger.info(f"Used env {pyversion=}, {env=}")
             self.logger.debug(f"Clean env {pyversion=}, {env=}")
             try:
+                env.release()
                 self.clean(env)
             except Exception:
                 self.logger.error(
@@ -68,6 +68,8 @@ class CondaEnvironment(ExecutionEnvironment):
 class CondaEnvironmentBuilder(ExecutionEnvironmentBuilder[CondaEnvironment]):
     """Conda environment builder."""
 
+    supportsClone = True
+
     def __init__(
         self,
         /,
@@ -104,6 +106,19 @@ class CondaEnvironmentBuilder(ExecutionEnvironmentBuilder[CondaEnvironment]):
         res.check_returncode()
         return CondaEnvironment(name=name, logger=logger)
 
+    @override
+    def clone(self, /, env, logger=None):
+        name = f"{self.envprefix}clone-{uuid1()}"
+        res = subprocess.run(
+            f"conda create -n {name} --clone {env.name} -y -q",
+            shell=True,
+            capture_output=True,
+            text=True,
+        )
+        logProcessResult(self.logger, res)
+        res.check_returncode()
+        return CondaEnvironment(name=name, logger=logger)
+
     @override
     def clean(self, /, env):
         subprocess.run(
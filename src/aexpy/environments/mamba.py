@@ -57,6 +57,8 @@ class MambaEnvironment(ExecutionEnvironment):
 class MambaEnvironmentBuilder(ExecutionEnvironmentBuilder[MambaEnvironment]):
     """Mamba environment builder."""
 
+    supportsClone = True
+
     def __init__(
         self,
         /,
@@ -97,6 +99,19 @@ class MambaEnvironmentBuilder(ExecutionEnvironmentBuilder[MambaEnvironment]):
         res.check_returncode()
         return MambaEnvironment(name=name, mamba=self.mamba, logger=logger)
 
+    @override
+    def clone(self, /, env, logger=None):
+        name = f"{self.envprefix}clone-{uuid1()}"
+        res = subprocess.run(
+            f"{self.mamba} create -n {name} --clone {env.name} -y -q",
+            shell=True,
+            capture_output=True,
+            text=True,
+        )
+        logProcessResult(self.logger, res)
+        res.check_returncode()
+        return MambaEnvironment(name=name, mamba=self.mamba, logger=logger)
+
     @override
     def clean(self, /, env):
         subprocess.run(
@@ -0,0 +1,242 @@
+"""
+Pool of pre-warmed execution environments, wrapping another environment builder (e.g. for mamba or conda).
+
+Environments are built in the background, up to `size` environments for each python version,
+by cloning a pristine template environment of the python version if the builder supports it (or building from scratch).
+`build` hands out a ready environment, and `clean` resets its pip packages to those when it was built and returns it to the pool.
+Environments used `maxUses` times or failed to reset are removed, and new ones are built in the background.
+
+A pool is usually shared, `bind` gives a builder of the pool that logs to the logger of a caller.
+"""
+
+import atexit
+import json
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from logging import Logger
+from typing import override
+
+from ..utils import logProcessResult
+from . import ExecutionEnvironment, ExecutionEnvironmentBuilder
+
+POOL_ENV = "AEXPY_ENV_POOL"
+
+
+@dataclass
+class PooledState:
+    pyversion: str
+    baseline: dict[str, str] = field(default_factory=dict)
+    """Installed pip packages when built."""
+    uses: int = 0
+
+
+class PooledEnvironmentBuilder[T: ExecutionEnvironment](ExecutionEnvironmentBuilder[T]):
+    def __init__(
+        self,
+        /,
+        builder: ExecutionEnvironmentBuilder[T],
+        size: int = 2,
+        maxUses: int = 20,
+        cloning: bool = True,
+        logger: Logger | None = None,
+    ) -> None:
+        super().__init__(logger=logger or builder.logger)
+        self.builder = builder
+        self.size = size
+        """Number of environments for each python version."""
+        self.maxUses = maxUses
+        self.executor = ThreadPoolExecutor(
+            max_workers=size, thread_name_prefix="env-pool"
+        )
+        self.lock = threading.Lock()
+        self.ready: dict[str, deque[Future[T]]] = {}
+        """Ready (or building) environments for each python version."""
+        self.counts: dict[str, int] = {}
+        """Number of ready, building and used environments for each python version."""
+        self.states: dict[int, PooledState] = {}
+        """States of pooled environments by object id."""
+        self.cloning = cloning and builder.supportsClone
+        """Whether to clone pooled environments from templates."""
+        self.templates: dict[str, T | None] = {}
+        """Pristine environment for each python version, None if failed to build."""
+        self.templateLock = threading.Lock()
+        self.closed = False
+        atexit.register(self.close)
+
+    def template(self, /, pyversion: str) -> T | None:
+        with self.templateLock:
+            if pyversion not in self.templates:
+                try:
+                    self.templates[pyversion] = self.builder.build(pyversion=pyversion)
+                except Exception:
+                    self.logger.error(
+                        f"Failed to build template env {pyversion=}", exc_info=True
+                    )
+                    self.templates[pyversion] = None
+            return self.templates[pyversion]
+
+    def create(self, /, pyversion: str) -> T:
+        template = self.template(pyversion) if self.cloning else None
+        if template is not None:
+            try:
+                return self.builder.clone(template)
+            except Exception:
+                self.logger.error(
+                    f"Failed to clone env {template=}, build it instead.",
+                    exc_info=True,
+                )
+        return self.builder.build(pyversion=pyversion)
+
+    def prepare(self, /, pyversion: str) -> T:
+        env = None
+        try:
+            env = self.create(pyversion)
+            self.states[id(env)] = PooledState(pyversion, self.installed(env))
+        except Exception:
+            self.logger.error(f"Failed to prepare env {pyversion=}", exc_info=True)
+            with self.lock:
+                self.counts[pyversion] -= 1
+            if env is not None:
+                self.builder.clean(env)
+            raise
+        self.logger.info(f"Prepared env {pyversion=}, {env=}")
+        return env
+
+    def submit(self, /, pyversion: str):
+        """Build an environment in the background, call with the lock held."""
+
+        self.counts[pyversion] = self.counts.get(pyversion, 0) + 1
+        self.ready.setdefault(pyversion, deque()).append(
+            self.executor.submit(self.prepare, pyversion)
+        )
+
+    def warm(self, /, pyversion: str = "3.12"):
+        """Build environments in the background until the pool is full."""
+
+        with self.lock:
+            while not self.closed and self.counts.get(pyversion, 0) < self.size:
+                self.submit(pyversion)
+
+    def installed(self, /, env: T, logger: Logger | None = None) -> dict[str, str]:
+        res = env.runner().runPythonText("-m pip list --format json")
+        logProcessResult(logger or self.logger, res)
+        res.check_returncode()
+        return {
+            item["name"].lower(): item["version"] for item in json.loads(res.stdout)
+        }
+
+    def reset(self, /, env: T, state: PooledState):
+        """Restore the pip packages of the environment to the baseline, return whether succeeded."""
+
+        try:
+            env.release()
+            runner = env.runner()
+            current = self.installed(env, env.logger)
+            added = [name for name in current if name not in state.baseline]
+            changed = [
+                f"{name}=={version}"
+                for name, version in state.baseline.items()
+                if current.get(name) != version
+            ]
+            if added:
+                res = runner.runPythonText(f"-m pip uninstall -y {' '.join(added)}")
+                logProcessResult(env.logger, res)
+                res.check_returncode()
+            if changed:
+                res = runner.runPythonText(f"-m pip install {' '.join(changed)}")
+                logProcessResult(env.logger, res)
+                res.check_returncode()
+            return True
+        except Exception:
+            env.logger.error(f"Failed to reset env {env=}", exc_info=True)
+            return False
+
+    @override
+    def build(self, /, pyversion="3.12", logger=None):
+        assert not self.closed, "Environment pool is closed."
+        self.warm(pyversion)
+        with self.lock:
+            queue = self.ready[pyversion]
+            if not queue:
+                # all environments are in use
+                self.submit(pyversion)
+            future = queue.popleft()
+        env = future.result()
+        if logger is not None:
+            env.logger = logger
+        return env
+
+    @override
+    def clean(self, /, env):
+        state = self.states.get(id(env))
+        if state is None or self.closed:
+            return self.builder.clean(env)
+
+        state.uses += 1
+        with self.lock:
+            keep = (
+                state.uses < self.maxUses and self.counts[state.pyversion] <= self.size
+            )
+        if keep and self.reset(env, state):
+            future: Future[T] = Future()
+            future.set_result(env)
+            with self.lock:
+                self.ready[state.pyversion].append(future)
+            return
+
+        with self.lock:
+            self.counts[state.pyversion] -= 1
+            del self.states[id(env)]
+        try:
+            env.release()
+            self.builder.clean(env)
+        finally:
+            self.warm(state.pyversion)
+
+    def bind(self, /, logger: Logger | None = None):
+        """Get a builder of the pool that logs to the logger."""
+
+        return BoundEnvironmentBuilder(self, logger)
+
+    def close(self, /):
+        """Remove all ready environments, and stop building."""
+
+        with self.lock:
+            self.closed = True
+            futures = [future for queue in self.ready.values() for future in queue]
+            self.ready.clear()
+            self.counts.clear()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        envs = [
+            future.result()
+            for future in futures
+            if not future.cancelled() and future.exception() is None
+        ]
+        envs.extend(env for env in self.templates.values() if env is not None)
+        self.templates.clear()
+        for env in envs:
+            self.states.pop(id(env), None)
+            try:
+                self.builder.clean(env)
+            except Exception:
+                self.logger.error(f"Failed to clean env {env=}", exc_info=True)
+
+
+class BoundEnvironmentBuilder[T: ExecutionEnvironment](ExecutionEnvironmentBuilder[T]):
+    """Builder of a shared pool for a caller, environments are built with the logger of the caller by default."""
+
+    def __init__(
+        self, /, pool: PooledEnvironmentBuilder[T], logger: Logger | None = None
+    ) -> None:
+        super().__init__(logger=logger or pool.logger)
+        self.pool = pool
+
+    @override
+    def build(self, /, pyversion="3.12", logger=None):
+        return self.pool.build(pyversion=pyversion, logger=logger or self.logger)
+
+    @override
+    def clean(self, /, env):
+        return self.pool.clean(env)
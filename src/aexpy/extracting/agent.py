@@ -0,0 +1,193 @@
+"""
+Long-lived API detector agents in execution environments, see aexpy.apidetector.agent for the agent side.
+
+An agent is started once for an environment (runner), with the detector copied once.
+Installing packages and extracting through the agent do not start a shell, activate the environment, or start an interpreter every time.
+The agent is closed when its environment is reset or removed (see ExecutionEnvironment.release),
+or when it is the least recently used one and not in use (see usingAgent).
+"""
+
+import atexit
+import json
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from logging import Logger
+from pathlib import Path
+
+from .. import getAppDirectory
+from ..environments import ExecutionEnvironmentRunner, onRelease
+from ..models import Distribution
+
+AGENT_ENV = "AEXPY_DETECT_AGENT"
+
+MAX_AGENTS = 2
+"""Maximum number of live agents, the least recently used agent not in use is closed when exceeded."""
+
+REQUEST_TIMEOUT = 3600
+"""Seconds to wait for the result of a request (installing or extracting), the agent is killed when exceeded."""
+
+
+class DetectorAgent:
+    def __init__(self, /, runner: ExecutionEnvironmentRunner, logger: Logger):
+        self.logger = logger
+        self.directory = Path(tempfile.mkdtemp(prefix="aexpy-agent-"))
+        # pydantic will failed if run in app directory under python 3.12 in another python
+        shutil.copytree(
+            getAppDirectory() / "apidetector", self.directory / "aexpy_apidetector"
+        )
+        self.logFile = self.directory / "agent.log"
+        """Output of the agent itself, the outputs of commands are in the results."""
+        with self.logFile.open("w") as log:
+            self.process = runner.startPython(
+                "-m aexpy_apidetector --agent",
+                cwd=self.directory,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=log,
+                # a process group of the shell and the agent, to kill both
+                start_new_session=hasattr(os, "killpg"),
+            )
+        self.lock = threading.Lock()
+        self.users = 0
+        """Number of callers using the agent, guarded by the lock of agents, see usingAgent."""
+        self.logger.debug(
+            f"Started detector agent {self.process.pid} in {self.directory}."
+        )
+
+    @property
+    def alive(self, /):
+        return self.process.poll() is None
+
+    def request(self, /, command: str, **args) -> subprocess.CompletedProcess[str]:
+        with self.lock:
+            assert self.process.stdin and self.process.stdout
+            try:
+                self.process.stdin.write(json.dumps({"command": command, **args}))
+                self.process.stdin.write("\n")
+                self.process.stdin.flush()
+                line = self.readline(REQUEST_TIMEOUT)
+            except BrokenPipeError:
+                line = ""
+        if not line:
+            raise Exception(
+                f"Detector agent exited: {self.logFile.read_text(errors='replace')}"
+            )
+        result = json.loads(line)
+        return subprocess.CompletedProcess(
+            command, result["returncode"], result["stdout"], result["stderr"]
+        )
+
+    def readline(self, /, timeout: float):
+        """Read a line of the output, kill the agent if it does not come in timeout seconds."""
+
+        assert self.process.stdout
+        lines: list[str] = []
+        reader = threading.Thread(
+            target=lambda: lines.append(self.process.stdout.readline()), daemon=True
+        )
+        reader.start()
+        reader.join(timeout)
+        if reader.is_alive():
+            self.kill()
+            reader.join()
+            raise TimeoutError(
+                f"Detector agent {self.process.pid} did not respond in {timeout} seconds."
+            )
+        return lines[0]
+
+    def install(self, /, packages: list[str]):
+        return self.request("install", packages=packages)
+
+    def extract(self, /, dist: Distribution, stream: Path, shards: int = 1):
+        return self.request(
+            "extract",
+            dist=dist.model_dump(mode="json", include={"rootPath", "topModules"}),
+            stream=str(stream),
+            shards=shards,
+        )
+
+    def kill(self, /):
+        """Kill the agent with the shell starting it."""
+
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            self.process.kill()
+        self.process.wait()
+
+    def close(self, /):
+        if self.alive:
+            # the agent stops at the end of stdin
+            try:
+                self.process.communicate(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.kill()
+                self.process.communicate()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.logger.debug(f"Closed detector agent {self.process.pid}.")
+
+
+_agents: OrderedDict[tuple[str, str], DetectorAgent] = OrderedDict()
+_agentsLock = threading.Lock()
+
+
+def agentKey(runner: ExecutionEnvironmentRunner):
+    return (runner.commandPrefix, runner.pythonName)
+
+
+@contextmanager
+def usingAgent(runner: ExecutionEnvironmentRunner, logger: Logger):
+    """Use the live agent in the environment of the runner, or start one, which is not evicted until the end of use."""
+
+    key = agentKey(runner)
+    with _agentsLock:
+        agent = _agents.pop(key, None)
+        if agent is not None and not agent.alive:
+            if agent.users == 0:
+                agent.close()
+            agent = None
+        if agent is None:
+            agent = DetectorAgent(runner, logger)
+        _agents[key] = agent
+        agent.users += 1
+        # evict the least recently used agents not in use, may exceed the maximum if all are in use
+        for evicted in [k for k, v in _agents.items() if v.users == 0]:
+            if len(_agents) <= MAX_AGENTS:
+                break
+            _agents.pop(evicted).close()
+    try:
+        yield agent
+    finally:
+        with _agentsLock:
+            agent.users -= 1
+            if agent.users == 0 and _agents.get(key) is not agent:
+                # released or replaced while in use
+                agent.close()
+
+
+@onRelease
+def closeAgent(runner: ExecutionEnvironmentRunner):
+    """Close the agent in the environment of the runner if any, or at the end of its use if it is in use."""
+
+    with _agentsLock:
+        agent = _agents.pop(agentKey(runner), None)
+        if agent is not None and agent.users > 0:
+            agent = None
+    if agent is not None:
+        agent.close()
+
+
+@atexit.register
+def closeAgents():
+    with _agentsLock:
+        while _agents:
+            _agents.popitem()[1].close()
@@ -1,44 +1,88 @@
+import json
+import os
 import shutil
 import tempfile
+import threading
+import time
+from logging import Logger
 from pathlib import Path
 from typing import Annotated, override
 
 from pydantic import Field, TypeAdapter
 
 from .. import getAppDirectory
+from ..environments import ExecutionEnvironment
 from ..models import ApiDescription, Distribution
-from ..models.description import (TRANSFER_BEGIN, ApiEntryType,
-                                  CollectionEntry, isPrivate)
+from ..models.description import (ApiEntryType, CollectionEntry, ItemScope,
+                                  isPrivate)
 from ..utils import logProcessResult
+from .agent import AGENT_ENV, usingAgent
 from .environment import EnvirontmentExtractor
 
+SHARDS_ENV = "AEXPY_DETECT_SHARDS"
+
+STREAM_FILE = "entries.ndjson"
+
+STREAM_TIMEOUT = 10
+"""Seconds to wait for the stream reader to finish after the detector exits."""
+
+_entryAdapter: TypeAdapter[ApiEntryType] = TypeAdapter(
+    Annotated[ApiEntryType, Field(discriminator="form")]
+)
+
+
+def readStream(api: ApiDescription, file: Path):
+    """Add the entries in the stream records of the API detector (see aexpy.apidetector.stream) to api."""
+
+    with file.open("rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "patch" in record:
+                entry = api[record["id"]]
+                if entry is None:
+                    continue
+                for name, value in record["patch"].items():
+                    setattr(entry, name, ItemScope(value) if name == "scope" else value)
+                continue
+            entry = _entryAdapter.validate_python(record)
+            if entry.id not in api:
+                api.add(entry)
+
 
 def resolveAlias(api: ApiDescription):
+    # reverse member index: target id -> [(collection, [member names])]
+    referrers: dict[str, list[tuple[CollectionEntry, list[str]]]] = {}
+    for item in api:
+        if not isinstance(item, CollectionEntry):
+            continue
+        targets: dict[str, list[str]] = {}
+        for name, target in item.members.items():
+            targets.setdefault(target, []).append(name)
+        for target, names in targets.items():
+            referrers.setdefault(target, []).append((item, names))
+
     alias: dict[str, set[str]] = {}
     working: set[str] = set()
 
-    def resolve(entry: ApiEntryType):
+    def resolve(entry: ApiEntryType | CollectionEntry):
         if entry.id in alias:
             return alias[entry.id]
         ret: set[str] = set()
         ret.add(entry.id)
         working.add(entry.id)
-        for item in api:
-            if not isinstance(item, CollectionEntry):
-                continue
-            itemalias = None
+        for item, names in referrers.get(entry.id, []):
             # ignore submodules and subclasses
             if item.id.startswith(f"{entry.id}."):
                 continue
-            for name, target in item.members.items():
-                if target == entry.id:
-                    if itemalias is None:
-                        if item.id in working:  # cycle reference
-                            itemalias = {item.id}
-                        else:
-                            itemalias = resolve(item)
-                    for aliasname in itemalias:
-                        ret.add(f"{aliasname}.{name}")
+            if item.id in working:  # cycle reference
+                itemalias = {item.id}
+            else:
+                itemalias = resolve(item)
+            for aliasname in itemalias:
+                for name in names:
+                    ret.add(f"{aliasname}.{name}")
         alias[entry.id] = ret
         working.remove(entry.id)
         return ret
@@ -50,35 +94,103 @@ def resolveAlias(api: ApiDescription):
 class BaseExtractor(EnvirontmentExtractor):
     """Basic extractor that uses dynamic inspect."""
 
+    def __init__(
+        self,
+        /,
+        logger: Logger | None = None,
+        env: ExecutionEnvironment | None = None,
+        shards: int | None = None,
+        agent: bool | None = None,
+    ) -> None:
+        super().__init__(logger, env)
+        self.shards = shards if shards is not None else int(os.getenv(SHARDS_ENV) or 1)
+        """Number of shards of submodules to detect in separate processes, default to AEXPY_DETECT_SHARDS."""
+        self.agent = agent if agent is not None else os.getenv(AGENT_ENV) != "0"
+        """Whether to install and detect through the long-lived agent in the environment, default to AEXPY_DETECT_AGENT (unless 0)."""
+
+    @override
+    def install(self, /, runner, packages):
+        if self.agent:
+            with usingAgent(runner, self.logger) as agent:
+                return agent.install(packages)
+        return super().install(runner, packages)
+
+    def joinReader(self, /, reader: threading.Thread, streamFile: Path):
+        """Wait for the stream reader after the detector exits, return whether it finished."""
+
+        deadline = time.monotonic() + STREAM_TIMEOUT
+        while reader.is_alive():
+            # the reader is blocked in opening the pipe if the detector failed before opening it,
+            # open the write end to release it (fails with ENXIO until the reader opens the read end)
+            try:
+                os.close(os.open(streamFile, os.O_WRONLY | os.O_NONBLOCK))
+            except OSError as ex:
+                self.logger.debug(
+                    f"Failed to open {streamFile} to unblock the reader: {ex}"
+                )
+            reader.join(0.1)
+            if reader.is_alive() and time.monotonic() > deadline:
+                self.logger.error(
+                    f"Stream reader of {streamFile} did not finish in {STREAM_TIMEOUT} seconds."
+                )
+                return False
+        return True
+
     @override
     def extractInEnv(self, /, result, runner):
         assert result.distribution
 
         with tempfile.TemporaryDirectory() as tmpdir:
 
-            # pydantic will failed if run in app directory under python 3.12 in another python
-            self.logger.debug(f"Copy from {getAppDirectory()} to {tmpdir}")
-            shutil.copytree(
-                getAppDirectory() / "apidetector", Path(tmpdir) / "aexpy_apidetector"
-            )
-
-            subres = runner.runPythonText(
-                f"-m aexpy_apidetector",
-                cwd=tmpdir,
-                input=result.distribution.model_dump_json(),
-            )
-
-        logProcessResult(self.logger, subres)
-
-        subres.check_returncode()
-
-        data = subres.stdout.split(TRANSFER_BEGIN, 1)[1]
-        entries: list[ApiEntryType] = TypeAdapter(
-            list[Annotated[ApiEntryType, Field(discriminator="form")]]
-        ).validate_json(data)
-        for entry in entries:
-            if entry.id not in result:
-                result.add(entry)
+            # entries are streamed through a named pipe and parsed while the detector runs,
+            # fall back to a regular file read after the run if named pipes are not supported
+            streamFile = Path(tmpdir) / STREAM_FILE
+            reader = None
+            errors: list[Exception] = []
+            if hasattr(os, "mkfifo"):
+                os.mkfifo(streamFile)
+
+                def read():
+                    try:
+                        readStream(result, streamFile)
+                    except Exception as ex:
+                        errors.append(ex)
+
+                reader = threading.Thread(target=read, daemon=True)
+                reader.start()
+
+            try:
+                if self.agent:
+                    with usingAgent(runner, self.logger) as agent:
+                        subres = agent.extract(
+                            result.distribution, streamFile, self.shards
+                        )
+                else:
+                    # pydantic will failed if run in app directory under python 3.12 in another python
+                    self.logger.debug(f"Copy from {getAppDirectory()} to {tmpdir}")
+                    shutil.copytree(
+                        getAppDirectory() / "apidetector",
+                        Path(tmpdir) / "aexpy_apidetector",
+                    )
+                    subres = runner.runPythonText(
+                        f"-m aexpy_apidetector --stream {STREAM_FILE}"
+                        + (f" --shards {self.shards}" if self.shards > 1 else ""),
+                        cwd=tmpdir,
+                        input=result.distribution.model_dump_json(),
+                    )
+            finally:
+                if reader is not None and not self.joinReader(reader, streamFile):
+                    errors.append(
+                        TimeoutError(f"Stream reader of {streamFile} did not finish.")
+                    )
+
+            logProcessResult(self.logger, subres)
+            subres.check_returncode()
+
+            if errors:
+                raise errors[0]
+            if reader is None:
+                readStream(result, streamFile)
 
         resolveAlias(result)
         for item in result:
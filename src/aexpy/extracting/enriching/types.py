@@ -3,6 +3,7 @@ import base64
 import json
 import logging
 from ast import NodeVisitor
+from hashlib import blake2b
 from typing import Iterable, Optional, override
 
 import mypy
@@ -164,23 +165,62 @@ class Translator:
         return TypeFactory.unknown(str(t))
 
 
-def encodeType(type: Type | None, logger: logging.Logger) -> mtyping.TypeType | None:
-    if type is None:
-        return None
-    try:
-        typed = Translator().accept(type)
-        result = type.serialize()
-        typed.id = str(typed)
-        if isinstance(result, str):
-            typed.raw = result
-            typed.data = result
-        else:
-            typed.raw = str(type)
-            typed.data = json.loads(json.dumps(result))
-        return typed
-    except Exception:
-        logger.error(f"Failed to encode type {type}.", exc_info=True)
-        return None
+class TypeEncoder:
+    """
+    Encode mypy types for an API description.
+
+    Types are interned in canonical form in the type table of the description,
+    and their serialized mypy types are stored once in the payload table (typePayloads) by content hash.
+    Short serialized types (strings, e.g. builtins.str) are kept in the types.
+    """
+
+    def __init__(
+        self, /, logger: logging.Logger, api: ApiDescription | None = None
+    ) -> None:
+        self.logger = logger
+        self.api = api
+
+    def payload(self, /, type: Type):
+        """Serialize the type, return its data and raw string."""
+
+        # not cached by mypy types, whose equality ignores e.g. the order of union items
+        data = type.serialize()
+        if isinstance(data, str):
+            return data, data
+        if self.api is not None:
+            # content hash, so that unchanged types keep their keys across releases
+            key = blake2b(json.dumps(data).encode(), digest_size=8).hexdigest()
+            self.api.typePayloads[key] = data
+            data = mtyping.PAYLOAD_PREFIX + key
+        return data, str(type)
+
+    def encode(self, /, type: Type | None) -> mtyping.TypeType | None:
+        if type is None:
+            return None
+        try:
+            typed = Translator().accept(type)
+            data, raw = self.payload(type)
+            if self.api is None:
+                return typed.model_copy(
+                    update={"id": str(typed), "raw": raw, "data": data}
+                )
+
+            table = self.api.typeTable()
+            typed = table.canonical(typed)
+            return table.intern(
+                typed.model_copy(
+                    update={"id": table.name(typed), "raw": raw, "data": data}
+                )
+            )
+        except Exception:
+            self.logger.error(f"Failed to encode type {type}.", exc_info=True)
+            return None
+
+
+def encodeType(type: Type | None, logger: logging.Logger):
+    """Encode the mypy type, with the serialized type stored in the type."""
+
+    return TypeEncoder(logger).encode(type)
 
 
 class TypeEnricher(Enricher):
@@ -197,6 +237,7 @@ class TypeEnricher(Enricher):
 
     @override
     def enrich(self, /, api):
+        encoder = TypeEncoder(self.logger, api)
         for entry in api:
             try:
                 match entry:
@@ -209,15 +250,15 @@ class TypeEnricher(Enricher):
 
                         if item:
                             type = item[0].type
-                            func.type = encodeType(type, self.logger)
+                            func.type = encoder.encode(type)
                             if isinstance(type, CallableType):
-                                func.returnType = encodeType(type.ret_type, self.logger)
+                                func.returnType = encoder.encode(type.ret_type)
                                 for para in func.parameters:
                                     if para.name not in type.arg_names:
                                         continue
                                     typara = type.argument_by_name(para.name)
-                                    para.type = encodeType(
-                                        typara.typ if typara else None, self.logger
+                                    para.type = encoder.encode(
+                                        typara.typ if typara else None
                                     )
                     case AttributeEntry() as attr:
                         item = self.server.element(attr)
@@ -226,9 +267,7 @@ class TypeEnricher(Enricher):
                             if attr.property:
                                 type = item[0].type
                                 if isinstance(type, CallableType):
-                                    attrType = encodeType(type.ret_type, self.logger)
-                            attr.type = attrType or encodeType(
-                                item[0].type, self.logger
-                            )
+                                    attrType = encoder.encode(type.ret_type)
+                            attr.type = attrType or encoder.encode(item[0].type)
             except Exception:
                 self.logger.error(f"Failed to enrich entry {entry.id}.", exc_info=True)
@@ -1,9 +1,13 @@
+import os
+import subprocess
 from abc import abstractmethod
 from logging import Logger
 from typing import override
 
 from .. import getEnvironmentManager
-from ..environments import ExecutionEnvironment, ExecutionEnvironmentRunner
+from ..environments import (ExecutionEnvironment, ExecutionEnvironmentBuilder,
+                            ExecutionEnvironmentRunner)
+from ..environments.pool import POOL_ENV, PooledEnvironmentBuilder
 from ..models import ApiDescription
 from ..utils import logProcessResult
 from . import Extractor
@@ -24,7 +28,27 @@ def getExtractorEnvironment(name: str, logger: Logger | None = None):
     return MambaEnvironment(name, ["pydantic"], logger=logger)
 
 
-def getExtractorEnvironmentBuilder(logger: Logger | None = None):
+_pool: PooledEnvironmentBuilder | None = None
+
+
+def getExtractorEnvironmentBuilder(
+    logger: Logger | None = None,
+) -> ExecutionEnvironmentBuilder:
+    """Get the environment builder, pooled (shared by calls) if AEXPY_ENV_POOL is set to the pool size."""
+
+    global _pool
+    size = int(os.getenv(POOL_ENV) or 0)
+    if size <= 0:
+        return createExtractorEnvironmentBuilder(logger)
+    if _pool is None:
+        # the pool outlives the caller, log to the caller through the bound builder
+        _pool = PooledEnvironmentBuilder(createExtractorEnvironmentBuilder(), size=size)
+    return _pool.bind(logger)
+
+
+def createExtractorEnvironmentBuilder(
+    logger: Logger | None = None,
+) -> ExecutionEnvironmentBuilder:
     env = getEnvironmentManager()
     if env == "conda":
         from ..environments.conda import CondaEnvironmentBuilder
@@ -63,6 +87,13 @@ class EnvirontmentExtractor(Extractor):
         """Extract the API description in the environment."""
         ...
 
+    def install(
+        self, /, runner: ExecutionEnvironmentRunner, packages: list[str]
+    ) -> subprocess.CompletedProcess[str]:
+        """Install packages in the environment."""
+
+        return runner.runPythonText(f"-m pip install {' '.join(packages)}")
+
     @override
     def extract(self, /, dist, product):
         with self.env as runner:
@@ -71,9 +102,7 @@ class EnvirontmentExtractor(Extractor):
                 if dist.wheelFile.is_file():
                     self.logger.info(f"Install package wheel file: {dist.wheelFile}")
                     try:
-                        res = runner.runPythonText(
-                            f"-m pip install {str(dist.wheelFile)}"
-                        )
+                        res = self.install(runner, [str(dist.wheelFile)])
                         logProcessResult(self.logger, res)
                         res.check_returncode()
                         doneDeps = True
@@ -82,10 +111,22 @@ class EnvirontmentExtractor(Extractor):
                             f"Failed to install wheel file: {dist.wheelFile}",
                             exc_info=True,
                         )
+            if not doneDeps and dist.dependencies:
+                # install all dependencies at once, and one by one if any failed
+                try:
+                    res = self.install(runner, dist.dependencies)
+                    logProcessResult(self.logger, res)
+                    res.check_returncode()
+                    doneDeps = True
+                except Exception:
+                    self.logger.warning(
+                        f"Failed to install dependencies at once, install them one by one: {dist.dependencies}",
+                        exc_info=True,
+                    )
             if not doneDeps and dist.dependencies:
                 for dep in dist.dependencies:
                     try:
-                        res = runner.runPythonText(f"-m pip install {dep}")
+                        res = self.install(runner, [dep])
                         # res = run(f"python -m pip --version", capture_output=True, text=True)
                         logProcessResult(self.logger, res)
                         res.check_returncode()
@@ -1,12 +1,14 @@
 import gzip
+import re
 from abc import ABC, abstractmethod
 from io import IOBase, UnsupportedOperation
 from pathlib import Path
-from typing import IO, Callable, Literal, overload, override
+from typing import IO, Callable, Literal, cast, overload, override
 
 from ..models import (ApiDescription, ApiDifference, CoreProduct, Distribution,
                       Product, Report)
 from ..utils import ensureDirectory
+from .indexed import LazyApiDescription, isIndexed, isIndexedFile
 
 
 class ProductLoader(ABC):
@@ -16,20 +18,59 @@ class ProductLoader(ABC):
     @abstractmethod
     def log(self, /) -> bytes: ...
 
+    def location(self, /) -> Path | None:
+        """Directory of the product file, which relative paths in the product (e.g. `ApiDescription.blobs`) are based on."""
+
+        return None
+
     def load[P: Product](self, /, cls: type[P]):
-        return cls.model_validate_json(self.raw())
+        data = self.raw()
+        if isIndexed(data):
+            from .indexed import loads
+
+            result = loads(data)
+            assert isinstance(result, cls), f"Not a {cls.__name__}: {result}"
+            return resolveBlobs(result, self.location())
+        return resolveBlobs(cls.model_validate_json(data), self.location())
+
+
+type ProductFormat = Literal["json", "indexed"]
+"""
+Product encoding format.
+
+json: (default) JSON
+indexed: random-access API descriptions with an entry index, see `indexed` module, other products fall back to json
+"""
 
 
 class ProductSaver(ABC):
+    format: ProductFormat = "json"
+
+    def dump(self, /, product: Product):
+        if isinstance(product, LazyApiDescription) and self.format != "indexed":
+            product = product.materialize()
+        if self.format == "indexed" and isinstance(product, ApiDescription):
+            from .indexed import dumps
+
+            return dumps(product)
+        return product.model_dump_json().encode()
+
     @abstractmethod
     def save(self, /, product: Product, log: str): ...
 
 
 class FileProductIO(ProductLoader, ProductSaver):
-    def __init__(self, /, target: Path, logFile: Path | None = None):
+    def __init__(
+        self,
+        /,
+        target: Path,
+        logFile: Path | None = None,
+        format: ProductFormat = "json",
+    ):
         super().__init__()
         self.target = target
         self.logFile = logFile
+        self.format = format
 
     def open(self, /, path: Path, write: bool = False):
         return path.open(mode="wb" if write else "rb")
@@ -38,18 +79,22 @@ class FileProductIO(ProductLoader, ProductSaver):
     def save(self, /, product, log):
         ensureDirectory(self.target.parent)
         with self.open(self.target, write=True) as f:
-            f.write(product.model_dump_json().encode())
+            f.write(self.dump(product))
         if self.logFile:
             with self.open(self.logFile, write=True) as f:
                 f.write(log.encode())
 
     @override
     def raw(self, /):
-        return self.target.read_bytes()
+        return readBytes(self.target)
+
+    @override
+    def location(self, /):
+        return self.target.parent
 
     @override
     def log(self, /):
-        return self.logFile.read_bytes() if self.logFile else b""
+        return readBytes(self.logFile) if self.logFile else b""
 
 
 class StreamProductLoader(ProductLoader):
@@ -67,29 +112,119 @@ class StreamProductLoader(ProductLoader):
             self.rawData = self.read(self.stream)
         return self.rawData
 
+    @override
+    def location(self, /):
+        # opened files, not stdin
+        name = getattr(self.stream, "name", None)
+        if isinstance(name, str) and Path(name).is_file():
+            return Path(name).parent
+        return None
+
     @override
     def log(self, /):
         return b""
 
 
 class StreamProductSaver(ProductSaver):
-    def __init__(self, /, target: IO[bytes], logStream: IO[bytes] | None = None):
+    def __init__(
+        self,
+        /,
+        target: IO[bytes],
+        logStream: IO[bytes] | None = None,
+        format: ProductFormat = "json",
+    ):
         super().__init__()
         self.target = target
         self.logStream = logStream
+        self.format = format
 
     def write(self, /, stream: IO[bytes], data: bytes):
         stream.write(data)
 
     @override
     def save(self, /, product, log):
-        self.write(self.target, product.model_dump_json().encode())
+        self.write(self.target, self.dump(product))
         if self.logStream:
             self.write(self.logStream, log.encode())
 
 
 type LoadSourceType = Path | IOBase | bytes | str | dict
 
+GZIP_MAGIC = b"\x1f\x8b"
+
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+_JSON_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\],]')
+
+
+def readBytes(data: Path | IOBase | bytes):
+    """Read product bytes, decompressing gzip or zstd data (detected by magic bytes) as a stream."""
+
+    import gzip
+
+    if isinstance(data, Path):
+        with data.open("rb") as f:
+            return readBytes(cast(IOBase, f))
+    if isinstance(data, IOBase):
+        try:
+            seekable = data.seekable()
+        except (AttributeError, UnsupportedOperation):
+            seekable = False
+        if not seekable:
+            return readBytes(cast(bytes, data.read()))
+        start = data.tell()
+        head = data.read(len(ZSTD_MAGIC))
+        data.seek(start)
+        if head[: len(GZIP_MAGIC)] == GZIP_MAGIC:
+            with gzip.GzipFile(fileobj=data, mode="rb") as f:
+                return f.read()
+        if head == ZSTD_MAGIC:
+            from .zstd import decompress
+
+            return decompress(data)
+        return cast(bytes, data.read())
+    if data[: len(GZIP_MAGIC)] == GZIP_MAGIC:
+        return gzip.decompress(data)
+    if data[: len(ZSTD_MAGIC)] == ZSTD_MAGIC:
+        from .zstd import decompress
+
+        return decompress(data)
+    return data
+
+
+def sniffProductType(
+    data: bytes | str,
+) -> type[Distribution | ApiDescription | ApiDifference | Report]:
+    """Detect the product type by the top-level keys, without parsing the whole document."""
+
+    if isinstance(data, str):
+        data = data.encode()
+    depth = 0
+    expectKey = False
+    for match in _JSON_TOKEN.finditer(data):
+        token = match.group()
+        if token == b"{" or token == b"[":
+            depth += 1
+            expectKey = token == b"{" and depth == 1
+        elif token == b"}" or token == b"]":
+            depth -= 1
+            if depth == 0:
+                break
+        elif token == b",":
+            expectKey = depth == 1
+        elif expectKey:
+            expectKey = False
+            match token[1:-1]:
+                case b"release":
+                    return Distribution
+                case b"distribution":
+                    return ApiDescription
+                case b"entries":
+                    return ApiDifference
+                case b"content":
+                    return Report
+    return Report
+
 
 @overload
 def load(data: LoadSourceType, fallback: None) -> CoreProduct: ...
@@ -112,43 +247,68 @@ def load(data: LoadSourceType) -> CoreProduct: ...
 def load[
     T: Product
 ](data: LoadSourceType, fallback: Callable[[dict], T] | type[T] | None = None):
-    import gzip
-    import json
+    return resolveBlobs(
+        _load(data, fallback), data.parent if isinstance(data, Path) else None
+    )
 
-    from ..models import ApiDescription, ApiDifference, Distribution, Report
 
-    try:
-        if isinstance(data, Path):
-            data = data.read_bytes()
-        if isinstance(data, IOBase):
-            data = data.read()
-        if isinstance(data, bytes):
-            try:
-                data = gzip.decompress(data)
-            except gzip.BadGzipFile:
-                pass
-            data = data.decode()
-        if isinstance(data, str):
-            data = json.loads(data)
-        assert isinstance(data, dict), f"Not a valid data type: {data}"
+def resolveBlobs[P: Product](product: P, base: Path | None = None) -> P:
+    """Resolve the texts of an API description stored in a blob store (see `blobs` module), base is the directory of the product file."""
+
+    if not isinstance(product, ApiDescription) or not product.blobs:
+        return product
+    from .blobs import internalize
 
+    if isinstance(product, LazyApiDescription):
+        product = cast(P, product.materialize())
+    return internalize(cast(ApiDescription, product), base=base)  # type: ignore
+
+
+def _load[
+    T: Product
+](data: LoadSourceType, fallback: Callable[[dict], T] | type[T] | None = None):
+    import json
+
+    try:
+        productType = None
+        if isinstance(data, Path) and isIndexedFile(data):
+            from .indexed import openFile
+
+            data = openFile(data)
+            if isinstance(fallback, type):
+                assert isinstance(data, fallback), f"Not a {fallback.__name__}: {data}"
+            return data
+        if isinstance(data, (Path, IOBase, bytes)):
+            data = readBytes(data)
+            if isIndexed(data):
+                from .indexed import loads
+
+                return loads(data)
         if isinstance(fallback, type):
-            return fallback.model_validate(data)
+            if isinstance(data, dict):
+                return fallback.model_validate(data)
+            return fallback.model_validate_json(data)
+        if not isinstance(data, dict):
+            productType = sniffProductType(data)
     except Exception as ex:
         raise Exception(f"Failed to read data") from ex
 
     try:
-        if "release" in data:
-            return Distribution.model_validate(data)
-        elif "distribution" in data:
-            return ApiDescription.model_validate(data)
-        elif "entries" in data:
-            return ApiDifference.model_validate(data)
-        else:
-            return Report.model_validate(data)
+        if isinstance(data, dict):
+            if "release" in data:
+                return Distribution.model_validate(data)
+            elif "distribution" in data:
+                return ApiDescription.model_validate(data)
+            elif "entries" in data:
+                return ApiDifference.model_validate(data)
+            else:
+                return Report.model_validate(data)
+        return productType.model_validate_json(data)
     except Exception as ex:
         if fallback:
             try:
+                if not isinstance(data, dict):
+                    data = json.loads(data)
                 return fallback(data)
             except Exception as ex:
                 raise Exception(f"Failed to load data") from ex
@@ -0,0 +1,222 @@
+"""
+Content-addressed blob store for large entry texts (src, docs, comments).
+
+Texts are stored once by hash, so consecutive releases of a project sharing a store
+only pay for the texts that changed. Entries reference blobs by BLOB_PREFIX + key,
+and the description records the store in `ApiDescription.blobs`, so that `aexpy.io.load` resolves them.
+The store is recorded relative to the directory of the product file, so that data trees can be moved or mounted elsewhere.
+
+Blobs are packed (zlib compressed) in a SQLite database under the store root, instead of a file for each blob.
+"""
+
+import re
+import sqlite3
+import zlib
+from hashlib import blake2b
+from pathlib import Path
+from typing import Iterable, override
+
+from pydantic import PrivateAttr
+
+from ..models import ApiDescription
+from ..models.description import ApiEntryType
+from ..utils import ensureDirectory
+
+BLOB_PREFIX = "aexpy-blob:"
+
+BLOB_FIELDS = ("src", "docs", "comments")
+
+MIN_BLOB_SIZE = 256
+"""Texts shorter than this are kept inline, since a reference and its row cost about 100 bytes."""
+
+BLOB_DATABASE = "blobs.db"
+
+_BLOB_REF = re.compile(re.escape(BLOB_PREFIX) + r"([0-9a-f]{32})")
+
+
+def blobKey(text: str):
+    return blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def isBlobRef(value: str):
+    return value.startswith(BLOB_PREFIX) and _BLOB_REF.fullmatch(value) is not None
+
+
+class BlobStore:
+    """Blobs packed in a SQLite database under root."""
+
+    def __init__(self, /, root: Path, readonly: bool = False) -> None:
+        self.root = root
+        self.readonly = readonly
+        """Open the database read-only, it must exist (for loading products)."""
+        self.cache: dict[str, str] = {}
+        self._connection: sqlite3.Connection | None = None
+
+    @property
+    def connection(self, /):
+        if self._connection is None:
+            if self.readonly:
+                database = self.root / BLOB_DATABASE
+                if not database.is_file():
+                    raise FileNotFoundError(f"Blob store {database} not found.")
+                self._connection = sqlite3.connect(
+                    f"{database.resolve().as_uri()}?mode=ro",
+                    uri=True,
+                    check_same_thread=False,
+                )
+                return self._connection
+            ensureDirectory(self.root)
+            self._connection = sqlite3.connect(
+                self.root / BLOB_DATABASE, check_same_thread=False
+            )
+            with self._connection:
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS blobs (key TEXT PRIMARY KEY, data BLOB NOT NULL)"
+                )
+        return self._connection
+
+    def close(self, /):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __contains__(self, /, key: str):
+        return (
+            key in self.cache
+            or self.connection.execute(
+                "SELECT 1 FROM blobs WHERE key = ?", (key,)
+            ).fetchone()
+            is not None
+        )
+
+    def putMany(self, /, texts: Iterable[str]):
+        """Store the texts (in one transaction) and return their references."""
+
+        refs: list[str] = []
+        rows: list[tuple[str, bytes]] = []
+        for text in texts:
+            key = blobKey(text)
+            if key not in self.cache:
+                self.cache[key] = text
+                rows.append((key, zlib.compress(text.encode())))
+            refs.append(BLOB_PREFIX + key)
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO blobs (key, data) VALUES (?, ?)", rows
+            )
+        return refs
+
+    def put(self, /, text: str):
+        """Store the text and return its reference."""
+
+        return self.putMany([text])[0]
+
+    def get(self, /, ref: str):
+        """Get the text by a reference or a key."""
+
+        key = ref.removeprefix(BLOB_PREFIX)
+        text = self.cache.get(key)
+        if text is None:
+            row = self.connection.execute(
+                "SELECT data FROM blobs WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"Blob {key} not found in {self.root}.")
+            text = self.cache[key] = zlib.decompress(row[0]).decode()
+        return text
+
+
+def recordedStore(api: ApiDescription, base: Path | None = None):
+    """Open the recorded blob store of the description read-only, base is the directory of the product file (default to the current directory)."""
+
+    assert api.blobs, "Not an externalized API description."
+    return BlobStore((base or Path()) / api.blobs, readonly=True)
+
+
+def externalize(api: ApiDescription, store: BlobStore, base: Path | None = None):
+    """
+    Return a copy of the description, whose large texts are moved to the blob store.
+
+    base is the directory the description will be saved in (default to the current directory),
+    the store is recorded relative to it.
+    """
+
+    result = ApiDescription.model_validate_json(api.model_dump_json())
+    targets: list[tuple[ApiEntryType, str]] = []
+    texts: list[str] = []
+    for entry in result:
+        for field in BLOB_FIELDS:
+            value: str = getattr(entry, field)
+            if len(value) >= MIN_BLOB_SIZE:
+                targets.append((entry, field))
+                texts.append(value)
+    for (entry, field), ref in zip(targets, store.putMany(texts)):
+        setattr(entry, field, ref)
+    result.blobs = (
+        store.root.resolve()
+        .relative_to((base or Path()).resolve(), walk_up=True)
+        .as_posix()
+    )
+    return result
+
+
+def internalize[
+    T: ApiDescription
+](api: T, store: BlobStore | None = None, base: Path | None = None) -> T:
+    """Resolve the blob references of the description in place, from the store (default to the recorded one, see recordedStore)."""
+
+    if store is None:
+        store = recordedStore(api, base)
+    for entry in api:
+        for field in BLOB_FIELDS:
+            value: str = getattr(entry, field)
+            if isBlobRef(value):
+                setattr(entry, field, store.get(value))
+    api.blobs = ""
+    return api
+
+
+class BlobApiDescription(ApiDescription):
+    """
+    API description whose blob references are resolved when entries are accessed.
+
+    Entries reached through the entry dicts (e.g. `functions`) directly are not resolved.
+    """
+
+    _blobs: BlobStore | None = PrivateAttr(default=None)
+    _inflated: set[str] = PrivateAttr(default_factory=set)
+
+    def attach(self, /, store: BlobStore | None = None, base: Path | None = None):
+        """Attach the store (default to the recorded one, see recordedStore) to resolve references."""
+
+        self._blobs = store or recordedStore(self, base)
+        self._inflated = set()
+        return self
+
+    def inflate[T: ApiEntryType](self, /, entry: T) -> T:
+        if self._blobs is None or entry.id in self._inflated:
+            return entry
+        for field in BLOB_FIELDS:
+            value: str = getattr(entry, field)
+            if isBlobRef(value):
+                setattr(entry, field, self._blobs.get(value))
+        self._inflated.add(entry.id)
+        return entry
+
+    @override
+    def __getitem__(self, /, id: str):
+        entry = super().__getitem__(id)
+        return self.inflate(entry) if entry is not None else None
+
+    @override
+    def __iter__(self, /):  # type: ignore
+        for entry in super().__iter__():
+            yield self.inflate(entry)
+
+    @override
+    def name(self, /, name: str):
+        return (self.inflate(entry) for entry in super().name(name))
+
+    @override
+    def children(self, /, id: str):
+        return (self.inflate(entry) for entry in super().children(id))
@@ -0,0 +1,203 @@
+"""
+Delta-encoded storage of the API descriptions of a project's release series.
+
+A release is stored as a delta to its parent release: the entries added or changed (detected by content hash) and the ids removed,
+and the type payloads (ApiDescription.typePayloads) added.
+A release without parent is a full snapshot, written every `snapshotInterval` releases to bound the reconstruction chain.
+
+Content hashes are the fingerprints of entries (see aexpy.models.description.fingerprint),
+which cover only the fields used by diffing and ignore the orders of set-derived lists,
+so re-extracting an unchanged release stores no entries. The other fields of an entry with unchanged content
+(e.g. a moved location) are stored as a patch of the changed fields, so that a reconstructed release equals the saved one.
+"""
+
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Annotated, Any, Iterable
+
+from pydantic import BaseModel, Field
+
+from ..models import ApiDescription
+from ..models.description import ApiEntryType, fingerprint
+from ..utils import ensureDirectory
+from .indexed import FIELD_FORMS
+
+
+def entryHash(entry: ApiEntryType):
+    return fingerprint(entry).hex()
+
+
+class ApiDelta(BaseModel):
+    parent: str = ""
+    """Parent version, empty for a full snapshot."""
+    header: ApiDescription = ApiDescription()
+    """The API description without entries and type payloads."""
+    removed: list[str] = []
+    entries: list[Annotated[ApiEntryType, Field(discriminator="form")]] = []
+    """Added or changed entries."""
+    hashes: dict[str, str] = {}
+    """Content hashes of all entries in this release."""
+    patches: dict[str, dict[str, Any]] = {}
+    """Changed fields (in JSON) of the entries with unchanged content hashes, by entry id."""
+    payloads: dict[str, dict | str] = {}
+    """Added type payloads."""
+    payloadKeys: list[str] = []
+    """Keys of all type payloads in this release."""
+
+
+class DeltaApiStore:
+    """
+    Delta-encoded API descriptions of a project, stored under root.
+
+    Reconstructed descriptions are cached and share unchanged entry objects with each other, do not modify them.
+    """
+
+    def __init__(
+        self, /, root: Path, snapshotInterval: int = 20, cacheSize: int = 4
+    ) -> None:
+        self.root = root
+        self.snapshotInterval = snapshotInterval
+        self.cacheSize = cacheSize
+        self.cache: OrderedDict[str, ApiDescription] = OrderedDict()
+
+    @property
+    def indexFile(self, /):
+        return self.root / "index.json"
+
+    def deltaFile(self, /, version: str):
+        return self.root / f"{version}.json"
+
+    def parents(self, /) -> dict[str, str]:
+        """Stored versions (in saving order) with their parents."""
+
+        if not self.indexFile.is_file():
+            return {}
+        return json.loads(self.indexFile.read_text())
+
+    def versions(self, /):
+        return list(self.parents())
+
+    def chain(self, /, version: str):
+        """Versions from the nearest snapshot to the version."""
+
+        parents = self.parents()
+        assert version in parents, f"Unknown version {version}."
+        result = [version]
+        while parents[result[-1]]:
+            result.append(parents[result[-1]])
+        return list(reversed(result))
+
+    def delta(self, /, version: str):
+        return ApiDelta.model_validate_json(self.deltaFile(version).read_bytes())
+
+    def save(self, /, api: ApiDescription, parent: str | None = None):
+        """Save the description as a delta to parent (default to the last saved version)."""
+
+        version = api.distribution.release.version
+        parents = self.parents()
+        assert version not in parents, f"Existed version {version}."
+        if parent is None:
+            parent = next(reversed(parents), "")
+        if parent and len(self.chain(parent)) >= self.snapshotInterval:
+            parent = ""
+
+        hashes = {entry.id: entryHash(entry) for entry in api}
+        delta = ApiDelta(
+            parent=parent,
+            header=ApiDescription.model_validate_json(
+                api.model_dump_json(exclude=set(FIELD_FORMS) | {"typePayloads"})
+            ),
+            hashes=hashes,
+            payloadKeys=list(api.typePayloads),
+        )
+        if parent:
+            # the reconstructed parent equals the saved one, and is usually cached
+            old = self.load(parent)
+            oldHashes = {entry.id: entryHash(entry) for entry in old}
+            delta.removed = [id for id in oldHashes if id not in hashes]
+            delta.entries = [
+                entry for entry in api if oldHashes.get(entry.id) != hashes[entry.id]
+            ]
+            delta.patches = self.patches(
+                old,
+                (entry for entry in api if oldHashes.get(entry.id) == hashes[entry.id]),
+            )
+            delta.payloads = {
+                key: value
+                for key, value in api.typePayloads.items()
+                if key not in old.typePayloads
+            }
+        else:
+            delta.entries = list(api)
+            delta.payloads = dict(api.typePayloads)
+
+        ensureDirectory(self.root)
+        self.deltaFile(version).write_text(delta.model_dump_json())
+        parents[version] = parent
+        self.indexFile.write_text(json.dumps(parents))
+        return delta
+
+    def patches(self, /, old: ApiDescription, entries: Iterable[ApiEntryType]):
+        result: dict[str, dict[str, Any]] = {}
+        for entry in entries:
+            oldEntry = old[entry.id]
+            assert oldEntry is not None
+            if oldEntry == entry:
+                continue
+            data = entry.model_dump(mode="json")
+            oldData = oldEntry.model_dump(mode="json")
+            result[entry.id] = {
+                name: value
+                for name, value in data.items()
+                if oldData.get(name) != value
+            }
+        return result
+
+    def load(self, /, version: str):
+        """Reconstruct the description of the version."""
+
+        chain = self.chain(version)
+        start = 0
+        current = None
+        for i in reversed(range(len(chain))):
+            if chain[i] in self.cache:
+                start, current = i + 1, self.cache[chain[i]]
+                self.cache.move_to_end(chain[i])
+                break
+
+        for item in chain[start:]:
+            delta = self.delta(item)
+            result = delta.header
+            changed = {entry.id: entry for entry in delta.entries}
+            for id, patch in delta.patches.items():
+                # entries are shared by cached releases, patch a copy
+                entry = current[id] if current is not None else None
+                if entry is not None:
+                    changed[id] = type(entry).model_validate(entry.model_dump() | patch)
+            result.typePayloads = {
+                key: (
+                    delta.payloads[key]
+                    if key in delta.payloads or current is None
+                    else current.typePayloads[key]
+                )
+                for key in delta.payloadKeys
+            }
+            if current is not None:
+                removed = set(delta.removed)
+                for entry in current:
+                    if entry.id not in removed:
+                        result.add(changed.pop(entry.id, entry))
+            for entry in changed.values():
+                result.add(entry)
+            current = result
+            self.remember(item, result)
+
+        assert current is not None
+        return current
+
+    def remember(self, /, version: str, api: ApiDescription):
+        self.cache[version] = api
+        self.cache.move_to_end(version)
+        while len(self.cache) > self.cacheSize:
+            self.cache.popitem(last=False)
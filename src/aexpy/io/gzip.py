@@ -1,8 +1,10 @@
 import gzip
+from io import IOBase
 from pathlib import Path
 from typing import IO, BinaryIO, cast, override
 
-from . import FileProductIO, StreamProductLoader, StreamProductSaver
+from . import (FileProductIO, ProductFormat, StreamProductLoader,
+               StreamProductSaver, readBytes)
 
 
 class GzipStreamProductLoader(StreamProductLoader):
@@ -21,16 +23,18 @@ class GzipStreamAutoProductLoader(StreamProductLoader):
 
     @override
     def read(self, /, stream):
-        data = stream.read()
-        try:
-            return gzip.decompress(data)
-        except gzip.BadGzipFile:
-            return data
+        return readBytes(cast(IOBase, stream))
 
 
 class GzipStreamProductSaver(StreamProductSaver):
-    def __init__(self, /, target: IO[bytes], logStream: IO[bytes] | None = None):
-        super().__init__(target, logStream)
+    def __init__(
+        self,
+        /,
+        target: IO[bytes],
+        logStream: IO[bytes] | None = None,
+        format: ProductFormat = "json",
+    ):
+        super().__init__(target, logStream, format)
 
     @override
     def write(self, /, stream, data):
@@ -39,8 +43,14 @@ class GzipStreamProductSaver(StreamProductSaver):
 
 
 class GzipFileProductIO(FileProductIO):
-    def __init__(self, /, target: Path, logFile: Path | None = None):
-        super().__init__(target, logFile)
+    def __init__(
+        self,
+        /,
+        target: Path,
+        logFile: Path | None = None,
+        format: ProductFormat = "json",
+    ):
+        super().__init__(target, logFile, format)
 
     @override
     def open(self, /, path, write=False):
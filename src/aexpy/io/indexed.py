@@ -0,0 +1,212 @@
+"""
+Random-access API description format.
+
+Layout: INDEXED_MAGIC, the JSON of each entry (concatenated), the JSON of the description header (without entries),
+the JSON index, and the index offset (8 bytes, little endian).
+
+The index maps each entry id to [form, offset, length, name, parent], so that entries can be decoded on demand.
+"""
+
+import json
+import mmap
+import weakref
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import Any, override
+
+from pydantic import PrivateAttr
+
+from ..models import ApiDescription
+from ..models.description import (ApiEntryType, AttributeEntry, ClassEntry,
+                                  FunctionEntry, ModuleEntry, SpecialEntry)
+
+INDEXED_MAGIC = b"AEXPYIX\x01"
+
+ENTRY_TYPES: dict[str, type[ApiEntryType]] = {
+    "module": ModuleEntry,
+    "class": ClassEntry,
+    "func": FunctionEntry,
+    "attr": AttributeEntry,
+    "special": SpecialEntry,
+}
+
+FIELD_FORMS = {
+    "modules": "module",
+    "classes": "class",
+    "functions": "func",
+    "attributes": "attr",
+    "specials": "special",
+}
+
+
+def isIndexed(data: bytes | memoryview | mmap.mmap):
+    return data[: len(INDEXED_MAGIC)] == INDEXED_MAGIC
+
+
+def isIndexedFile(path: Path):
+    with path.open("rb") as f:
+        return isIndexed(f.read(len(INDEXED_MAGIC)))
+
+
+def dumps(api: ApiDescription) -> bytes:
+    parts = [INDEXED_MAGIC]
+    offset = len(INDEXED_MAGIC)
+    entries: dict[str, list] = {}
+    for entry in api:
+        data = entry.model_dump_json().encode()
+        entries[entry.id] = [entry.form, offset, len(data), entry.name, entry.parent]
+        parts.append(data)
+        offset += len(data)
+
+    header = api.model_dump_json(exclude=set(FIELD_FORMS)).encode()
+    parts.append(header)
+    index = json.dumps(
+        {"header": [offset, len(header)], "entries": entries},
+        separators=(",", ":"),
+    ).encode()
+    offset += len(header)
+    parts.append(index)
+    parts.append(offset.to_bytes(8, "little"))
+    return b"".join(parts)
+
+
+class EntryStore(Mapping[str, ApiEntryType]):
+    """Read-only mapping from id to entry, decoding entries on demand."""
+
+    def __init__(self, /, data: bytes | mmap.mmap, closer: Any = None):
+        assert isIndexed(data), "Not an indexed API description."
+        self.data = data
+        self.closer = closer
+        indexOffset = int.from_bytes(data[-8:], "little")
+        index = json.loads(data[indexOffset:-8])
+        self.header: tuple[int, int] = tuple(index["header"])
+        self.index: dict[str, list] = index["entries"]
+        self.cache: weakref.WeakValueDictionary[str, ApiEntryType] = (
+            weakref.WeakValueDictionary()
+        )
+
+    def raw(self, /, offset: int, length: int):
+        return self.data[offset : offset + length]
+
+    def ids(self, /, form: str):
+        return [id for id, item in self.index.items() if item[0] == form]
+
+    def close(self, /):
+        self.cache.clear()
+        if self.closer is not None:
+            self.closer.close()
+            self.closer = None
+
+    @override
+    def __getitem__(self, /, id: str):
+        entry = self.cache.get(id)
+        if entry is None:
+            form, offset, length, *_ = self.index[id]
+            entry = ENTRY_TYPES[form].model_validate_json(self.raw(offset, length))
+            self.cache[id] = entry
+        return entry
+
+    @override
+    def __contains__(self, /, id: object):
+        return id in self.index
+
+    @override
+    def __iter__(self, /) -> Iterator[str]:
+        return iter(self.index)
+
+    @override
+    def __len__(self, /):
+        return len(self.index)
+
+
+class LazyEntries[T: ApiEntryType](Mapping[str, T]):
+    """Read-only view of the entries of one form in an entry store."""
+
+    def __init__(self, /, store: EntryStore, form: str):
+        self.store = store
+        self.ids = store.ids(form)
+        self.idset = set(self.ids)
+
+    @override
+    def __getitem__(self, /, id: str) -> T:
+        if id not in self.idset:
+            raise KeyError(id)
+        return self.store[id]  # type: ignore
+
+    @override
+    def __contains__(self, /, id: object):
+        return id in self.idset
+
+    @override
+    def __iter__(self, /) -> Iterator[str]:
+        return iter(self.ids)
+
+    @override
+    def __len__(self, /):
+        return len(self.ids)
+
+
+class LazyApiDescription(ApiDescription):
+    """Read-only API description whose entries are decoded on demand from an entry store."""
+
+    _store: EntryStore | None = PrivateAttr(default=None)
+
+    @override
+    def model_post_init(self, context: Any, /):
+        # indexes are built from the entry store after it is attached
+        pass
+
+    @classmethod
+    def fromStore(cls, /, store: EntryStore):
+        header = ApiDescription.model_validate_json(store.raw(*store.header))
+        result = cls.model_construct(
+            **{name: getattr(header, name) for name in header.model_fields_set},
+            **{field: LazyEntries(store, form) for field, form in FIELD_FORMS.items()},
+        )
+        result._store = store
+        result.reindex()
+        return result
+
+    @override
+    def reindex(self, /):
+        if self._store is None:
+            return super().reindex()
+        self._entries = self._store
+        self._names = {}
+        self._children = {}
+        for id, (_, _, _, name, parent) in self._store.index.items():
+            self._names.setdefault(name, []).append(id)
+            if parent:
+                self._children.setdefault(parent, []).append(id)
+        self.clearResolveCache()
+        self.clearFingerprints()
+
+    @override
+    def add(self, /, entry):
+        raise TypeError("Lazy API description is read-only, use materialize() first.")
+
+    def materialize(self, /):
+        """Decode all entries into a normal API description."""
+
+        result = ApiDescription.model_validate_json(
+            self.model_dump_json(exclude=set(FIELD_FORMS))
+        )
+        for entry in self:
+            result.add(entry)
+        return result
+
+    def close(self, /):
+        if self._store is not None:
+            self._store.close()
+
+
+def loads(data: bytes):
+    return LazyApiDescription.fromStore(EntryStore(data))
+
+
+def openFile(path: Path):
+    """Memory-map an indexed API description file."""
+
+    with path.open("rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return LazyApiDescription.fromStore(EntryStore(mapped, mapped))
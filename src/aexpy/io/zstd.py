@@ -0,0 +1,118 @@
+"""
+Zstandard compression for products, based on zstandard (optional dependency).
+
+Compression is multithreaded. An optional dictionary trained on typical products (see `trainDictionary`)
+improves the ratio, it is given by the AEXPY_ZSTD_DICT environment variable and required to decompress the data compressed with it.
+"""
+
+import os
+from functools import cache
+from io import IOBase
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, BinaryIO, Iterable, cast, override
+
+from . import ZSTD_MAGIC, FileProductIO, ProductFormat, StreamProductSaver
+
+if TYPE_CHECKING:
+    from zstandard import ZstdCompressionDict
+
+ZSTD_DICT_ENV = "AEXPY_ZSTD_DICT"
+
+DEFAULT_LEVEL = 3
+
+DEFAULT_DICT_SIZE = 112640
+
+SAMPLE_SIZE = 4096
+"""Products are split into samples of this size for dictionary training."""
+
+
+def isZstd(data: bytes):
+    return data[: len(ZSTD_MAGIC)] == ZSTD_MAGIC
+
+
+@cache
+def _loadDictionary(path: Path) -> "ZstdCompressionDict":
+    import zstandard
+
+    return zstandard.ZstdCompressionDict(path.read_bytes())
+
+
+def getDictionary() -> "ZstdCompressionDict | None":
+    path = os.getenv(ZSTD_DICT_ENV)
+    return _loadDictionary(Path(path).resolve()) if path else None
+
+
+def compressor(level: int = DEFAULT_LEVEL):
+    import zstandard
+
+    dictionary = getDictionary()
+    if dictionary is not None:
+        return zstandard.ZstdCompressor(level=level, dict_data=dictionary, threads=-1)
+    return zstandard.ZstdCompressor(level=level, threads=-1)
+
+
+def decompressor():
+    import zstandard
+
+    return zstandard.ZstdDecompressor(dict_data=getDictionary())
+
+
+def compress(data: bytes):
+    return compressor().compress(data)
+
+
+def decompress(data: bytes | IOBase):
+    """Decompress zstd data (bytes or a binary stream) as a stream, since the content size may be unknown."""
+
+    from io import BytesIO
+
+    if isinstance(data, bytes):
+        data = BytesIO(data)
+    with decompressor().stream_reader(data, closefd=False) as f:
+        return f.read()
+
+
+def trainDictionary(products: Iterable[bytes], size: int = DEFAULT_DICT_SIZE):
+    """Train a dictionary on the (uncompressed) product data."""
+
+    import zstandard
+
+    samples = [
+        product[i : i + SAMPLE_SIZE]
+        for product in products
+        for i in range(0, len(product), SAMPLE_SIZE)
+    ]
+    return zstandard.train_dictionary(size, samples, threads=-1).as_bytes()
+
+
+class ZstdStreamProductSaver(StreamProductSaver):
+    def __init__(
+        self,
+        /,
+        target: IO[bytes],
+        logStream: IO[bytes] | None = None,
+        format: ProductFormat = "json",
+    ):
+        super().__init__(target, logStream, format)
+
+    @override
+    def write(self, /, stream, data):
+        with compressor().stream_writer(stream, size=len(data), closefd=False) as f:
+            f.write(data)
+
+
+class ZstdFileProductIO(FileProductIO):
+    def __init__(
+        self,
+        /,
+        target: Path,
+        logFile: Path | None = None,
+        format: ProductFormat = "json",
+    ):
+        super().__init__(target, logFile, format)
+
+    @override
+    def open(self, /, path, write=False):
+        if write:
+            return cast(BinaryIO, compressor().stream_writer(path.open("wb")))
+        return cast(BinaryIO, decompressor().stream_reader(path.open("rb")))
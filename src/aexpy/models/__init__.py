@@ -2,15 +2,21 @@ from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 from enum import IntEnum
 from functools import cached_property
+from hashlib import blake2b
 from pathlib import Path
-from typing import override
+from typing import Any, override
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import (BaseModel, ConfigDict, Field, PrivateAttr,
+                      SerializationInfo, SerializerFunctionWrapHandler,
+                      ValidatorFunctionWrapHandler, field_validator,
+                      model_serializer, model_validator)
 
 from .description import (ApiEntry, ApiEntryType, AttributeEntry, ClassEntry,
                           CollectionEntry, FunctionEntry, ItemScope,
-                          ModuleEntry, Parameter, SpecialEntry)
+                          ModuleEntry, Parameter, SpecialEntry, entryTypes,
+                          fingerprint)
 from .difference import BreakingRank, DiffEntry
+from .typing import PAYLOAD_PREFIX, Type, TypeTable, referencing
 
 
 class Release(BaseModel):
@@ -144,24 +150,104 @@ class ApiDescription(SingleProduct):
     functions: dict[str, FunctionEntry] = {}
     attributes: dict[str, AttributeEntry] = {}
     specials: dict[str, SpecialEntry] = {}
+    typePayloads: dict[str, dict | str] = {}
+    """Serialized mypy types, referenced by Type.data (PAYLOAD_PREFIX + key)."""
+    blobs: str = ""
+    """Path of the blob store holding the large texts of entries (see aexpy.io.blobs), relative to the directory of the product file, empty if all texts are inline."""
+
+    _entries: dict[str, ApiEntryType] = PrivateAttr(default_factory=dict)
+    """Unified index from id to entry."""
+    _names: dict[str, list[str]] = PrivateAttr(default_factory=dict)
+    """Index from entry name to entry ids."""
+    _children: dict[str, list[str]] = PrivateAttr(default_factory=dict)
+    """Index from parent id to children ids."""
+    _resolved: dict[str, ApiEntryType | None] = PrivateAttr(default_factory=dict)
+    """Cache for resolve, from qualified name to entry."""
+    _resolvedMembers: dict[tuple[str, str], ApiEntryType | None] = PrivateAttr(
+        default_factory=dict
+    )
+    """Cache for resolveMember, from (collection id, member name) to entry."""
+    _resolveHits: int = PrivateAttr(default=0)
+    _resolveMisses: int = PrivateAttr(default=0)
+    _fingerprints: dict[str, bytes] = PrivateAttr(default_factory=dict)
+    """Cache for fingerprint, from id to the entry fingerprint."""
+    _treeFingerprints: dict[str, bytes] = PrivateAttr(default_factory=dict)
+    """Cache for treeFingerprint, from id to the subtree fingerprint."""
+    _types: TypeTable = PrivateAttr(default_factory=TypeTable)
+    """Table of interned types, see `internTypes`, rebuilt from the serialized type table when loaded."""
+    _typeChecker: Any = PrivateAttr(default=None)
+    """Type compatibility checker of the description, see `aexpy.diffing.evaluators.typing`."""
+
+    @override
+    def model_post_init(self, context: Any, /):
+        super().model_post_init(context)
+        self.reindex()
+
+    @model_serializer(mode="wrap")
+    def dumpTypes(
+        self, handler: SerializerFunctionWrapHandler, info: SerializationInfo, /
+    ):
+        """Serialize types of entries to JSON as indices in the type table (types), stored once."""
+
+        if not info.mode_is_json():
+            return handler(self)
+        table = TypeTable()
+        with referencing(table):
+            result = handler(self)
+        if table:
+            result["types"] = table.dump()
+        return result
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def loadTypes(cls, data: Any, handler: ValidatorFunctionWrapHandler, /):
+        """Rebuild types of entries from the type table (types), shared by the entries, see `dumpTypes`."""
+
+        if not isinstance(data, dict) or "types" not in data:
+            return handler(data)
+        data = dict(data)
+        table = TypeTable.load(data.pop("types"))
+        with referencing(table):
+            result = handler(data)
+        result._types = table
+        return result
+
+    def reindex(self, /):
+        """Rebuild the indexes from the entry dicts."""
+
+        self._entries = {}
+        self._names = {}
+        self._children = {}
+        self.clearResolveCache()
+        self.clearFingerprints()
+        for entries in (
+            self.modules,
+            self.classes,
+            self.functions,
+            self.attributes,
+            self.specials,
+        ):
+            for entry in entries.values():
+                if entry.id not in self._entries:
+                    self._indexEntry(entry)
+
+    @override
+    def model_copy(self, /, *, update=None, deep=False):
+        result = super().model_copy(update=update, deep=deep)
+        result.reindex()
+        return result
+
+    def _indexEntry(self, /, entry: ApiEntryType):
+        self._entries[entry.id] = entry
+        self._names.setdefault(entry.name, []).append(entry.id)
+        if entry.parent:
+            self._children.setdefault(entry.parent, []).append(entry.id)
 
     def __contains__(self, /, id: str):
-        return (
-            id in self.modules
-            or id in self.classes
-            or id in self.functions
-            or id in self.attributes
-            or id in self.specials
-        )
+        return id in self._entries
 
     def __getitem__(self, /, id: str):
-        return (
-            self.modules.get(id)
-            or self.classes.get(id)
-            or self.functions.get(id)
-            or self.attributes.get(id)
-            or self.specials.get(id)
-        )
+        return self._entries.get(id)
 
     def __iter__(self, /):  # type: ignore overrides class "BaseModel" in an incompatible manner
         yield from self.modules.values()
@@ -196,7 +282,31 @@ class ApiDescription(SingleProduct):
         assert self.distribution is not None
         return self.distribution.single()
 
+    def clearResolveCache(self, /):
+        """Invalidate cached results of resolve and resolveMember."""
+
+        self._resolved = {}
+        self._resolvedMembers = {}
+
+    def resolveCacheInfo(self, /):
+        """Return hits, misses and size of the resolution cache."""
+
+        return {
+            "hits": self._resolveHits,
+            "misses": self._resolveMisses,
+            "size": len(self._resolved) + len(self._resolvedMembers),
+        }
+
     def resolve(self, /, qualName: str):
+        if qualName in self._resolved:
+            self._resolveHits += 1
+            return self._resolved[qualName]
+        self._resolveMisses += 1
+        result = self._resolve(qualName)
+        self._resolved[qualName] = result
+        return result
+
+    def _resolve(self, /, qualName: str):
         if qualName in self:
             return self[qualName]
         if "." not in qualName:
@@ -209,6 +319,19 @@ class ApiDescription(SingleProduct):
         return None
 
     def resolveMember(self, /, entry: CollectionEntry, member: str):
+        if self._entries.get(entry.id) is not entry:
+            # not an entry of this description, the cache key is not reliable
+            return self._resolveMember(entry, member)
+        key = entry.id, member
+        if key in self._resolvedMembers:
+            self._resolveHits += 1
+            return self._resolvedMembers[key]
+        self._resolveMisses += 1
+        result = self._resolveMember(entry, member)
+        self._resolvedMembers[key] = result
+        return result
+
+    def _resolveMember(self, /, entry: CollectionEntry, member: str):
         if isinstance(entry, ModuleEntry):
             target = entry.members.get(member)
             return self[target] if target and target in self else None
@@ -249,6 +372,9 @@ class ApiDescription(SingleProduct):
             self.specials[entry.id] = entry
         else:
             raise Exception(f"Unknown entry type: {entry.__class__} of {entry}")
+        self._indexEntry(entry)
+        self.clearResolveCache()
+        self.clearFingerprints()
 
     def calcCallers(self, /):
         callers: dict[str, set[str]] = {}
@@ -283,13 +409,230 @@ class ApiDescription(SingleProduct):
                 entry.subclasses = list(subclass)
 
     def name(self, /, name: str):
-        return (item for item in self if item.name == name)
+        return (self._entries[id] for id in self._names.get(name, []))
+
+    def children(self, /, id: str):
+        return (self._entries[child] for child in self._children.get(id, []))
+
+    def descendants(self, /, id: str):
+        """Return ids of all entries under the entry (by parent)."""
+
+        result: list[str] = []
+        visited = {id}
+        stack = [id]
+        while stack:
+            for child in self._children.get(stack.pop(), []):
+                if child not in visited:
+                    visited.add(child)
+                    result.append(child)
+                    stack.append(child)
+        return result
+
+    def typeTable(self, /):
+        return self._types
+
+    def typePayload(self, /, type: Type):
+        """Return the serialized mypy type of the type, stored in the type or in typePayloads."""
+
+        if isinstance(type.data, str) and type.data.startswith(PAYLOAD_PREFIX):
+            return self.typePayloads.get(type.data.removeprefix(PAYLOAD_PREFIX), "")
+        return type.data
+
+    def internTypes(self, /):
+        """Share structurally equal types of the entries through the type table, return the table."""
+
+        table = self._types
+        for entry in self:
+            if isinstance(entry, (FunctionEntry, AttributeEntry)) and entry.type:
+                entry.type = table.intern(entry.type)
+            if isinstance(entry, FunctionEntry):
+                if entry.returnType is not None:
+                    entry.returnType = table.intern(entry.returnType)
+                for para in entry.parameters:
+                    if para.type is not None:
+                        para.type = table.intern(para.type)
+        return table
+
+    def clearFingerprints(self, /):
+        """Invalidate cached fingerprints, call it after modifying entries in place."""
+
+        self._fingerprints = {}
+        self._treeFingerprints = {}
+
+    def fingerprint(self, /, id: str):
+        """Return the structural fingerprint of the entry, see `description.fingerprint`."""
+
+        result = self._fingerprints.get(id)
+        if result is None:
+            result = self._fingerprints[id] = fingerprint(self._entries[id])
+        return result
+
+    def treeFingerprint(self, /, id: str):
+        """Return the Merkle-style fingerprint of the entry and all entries under it."""
+
+        result = self._treeFingerprints.get(id)
+        if result is not None:
+            return result
+        # stop on (malformed) parent cycles
+        self._treeFingerprints[id] = self.fingerprint(id)
+        hasher = blake2b(self.fingerprint(id), digest_size=16)
+        for child in sorted(self._children.get(id, [])):
+            hasher.update(child.encode())
+            hasher.update(self.treeFingerprint(child))
+        result = self._treeFingerprints[id] = hasher.digest()
+        return result
+
+
+class DiffEntries(dict[str, DiffEntry]):
+    """Entries of an API difference, counting mutations to invalidate the indexes of the difference."""
+
+    mutations: int = 0
+
+    @override
+    def __setitem__(self, /, key: str, value: DiffEntry):
+        self.mutations += 1
+        super().__setitem__(key, value)
+
+    @override
+    def __delitem__(self, /, key: str):
+        self.mutations += 1
+        super().__delitem__(key)
+
+    @override
+    def __ior__(self, /, other):  # type: ignore
+        self.mutations += 1
+        return super().__ior__(other)
+
+    @override
+    def update(self, /, *args, **kwargs):
+        self.mutations += 1
+        super().update(*args, **kwargs)
+
+    @override
+    def setdefault(self, /, key: str, default: DiffEntry):  # type: ignore
+        self.mutations += 1
+        return super().setdefault(key, default)
+
+    @override
+    def pop(self, /, *args):  # type: ignore
+        self.mutations += 1
+        return super().pop(*args)
+
+    @override
+    def popitem(self, /):
+        self.mutations += 1
+        return super().popitem()
+
+    @override
+    def clear(self, /):
+        self.mutations += 1
+        super().clear()
 
 
 class ApiDifference(PairProduct):
     old: Distribution = Distribution()
     new: Distribution = Distribution()
-    entries: dict[str, DiffEntry] = {}
+    entries: dict[str, DiffEntry] = Field(default={}, validate_default=True)
+    typePayloads: dict[str, dict | str] = {}
+    """Serialized mypy types referenced by the types of old and new entries, see `collectTypePayloads`."""
+
+    _kinds: dict[str, list[DiffEntry]] = PrivateAttr(default_factory=dict)
+    """Index from kind to entries."""
+    _ranks: dict[BreakingRank, list[DiffEntry]] = PrivateAttr(default_factory=dict)
+    """Index from rank to entries."""
+    _breaking: dict[BreakingRank, list[DiffEntry]] = PrivateAttr(default_factory=dict)
+    """Cache for breaking, from rank to entries."""
+    _indexed: tuple[dict[str, DiffEntry] | None, int] = PrivateAttr(default=(None, 0))
+    """The entries dict and its mutation count when the indexes were built."""
+    _descriptions: tuple[ApiDescription, ApiDescription] | None = PrivateAttr(
+        default=None
+    )
+    """Paired descriptions to resolve entries of slim differences."""
+
+    @field_validator("entries", mode="after")
+    @classmethod
+    def trackEntries(cls, value: dict[str, DiffEntry]):
+        return DiffEntries(value)
+
+    def slim(self, /):
+        """Return a copy whose entries refer to API entries by ids only, see `attach` to resolve them."""
+
+        result = self.model_copy(
+            update={"entries": {id: e.slim() for id, e in self.entries.items()}}
+        )
+        result._descriptions = None
+        return result
+
+    def attach(self, /, old: ApiDescription, new: ApiDescription):
+        """Attach the paired descriptions, to resolve old and new entries of slim entries on access."""
+
+        self._descriptions = old, new
+        return self
+
+    def inflate(self, /, entry: DiffEntry):
+        """Return a copy of a slim entry with old and new entries resolved from the attached descriptions, the stored entry is kept slim."""
+
+        if self._descriptions is None:
+            return entry
+        old, new = self._descriptions
+        update = {}
+        if entry.old is None and entry.oldId:
+            update["old"] = old[entry.oldId]
+        if entry.new is None and entry.newId:
+            update["new"] = new[entry.newId]
+        return entry.model_copy(update=update) if update else entry
+
+    def collectTypePayloads(self, /, old: ApiDescription, new: ApiDescription):
+        """Copy the type payloads referenced by the old and new entries from the paired descriptions."""
+
+        for entry in self.entries.values():
+            for api, item in ((old, entry.old), (new, entry.new)):
+                if item is None:
+                    continue
+                for type in entryTypes(item):
+                    if isinstance(type.data, str) and type.data.startswith(
+                        PAYLOAD_PREFIX
+                    ):
+                        key = type.data.removeprefix(PAYLOAD_PREFIX)
+                        if key in api.typePayloads:
+                            self.typePayloads[key] = api.typePayloads[key]
+        return self
+
+    def typePayload(self, /, type: Type):
+        """Return the serialized mypy type of the type (of an old or new entry), stored in the type or in typePayloads."""
+
+        if isinstance(type.data, str) and type.data.startswith(PAYLOAD_PREFIX):
+            return self.typePayloads.get(type.data.removeprefix(PAYLOAD_PREFIX), "")
+        return type.data
+
+    def clearIndex(self, /):
+        """Invalidate the kind and rank indexes, call it after modifying entries in place (e.g. kind or rank)."""
+
+        self._indexed = None, 0
+
+    def _index(self, /):
+        # rebuild if entries is replaced or mutated
+        if not isinstance(self.entries, DiffEntries):
+            # replaced by assignment
+            self.entries = DiffEntries(self.entries)
+        if (
+            self._indexed[0] is self.entries
+            and self._indexed[1] == self.entries.mutations
+        ):
+            return
+        self._kinds = {}
+        self._ranks = {}
+        self._breaking = {}
+        for entry in self.entries.values():
+            self._kinds.setdefault(entry.kind, []).append(entry)
+            self._ranks.setdefault(entry.rank, []).append(entry)
+        self._indexed = self.entries, self.entries.mutations
+
+    @override
+    def model_copy(self, /, *, update=None, deep=False):
+        result = super().model_copy(update=update, deep=deep)
+        result.clearIndex()
+        return result
 
     @override
     def overview(self, /):
@@ -322,28 +665,40 @@ class ApiDifference(PairProduct):
         return ReleasePair(old=self.old.single(), new=self.new.single())
 
     def kind(self, /, name: str):
-        return [x for x in self.entries.values() if x.kind == name]
+        self._index()
+        return [self.inflate(x) for x in self._kinds.get(name, [])]
 
     def kinds(self, /):
-        return list({x.kind for x in self.entries.values()})
+        self._index()
+        return list(self._kinds)
+
+    def rankCounts(self, /):
+        """Return the number of entries of each rank."""
+
+        self._index()
+        return {rank: len(items) for rank, items in self._ranks.items()}
 
     def evaluate(self, /):
+        counts = self.rankCounts()
         changesCount: "dict[BreakingRank, int]" = {}
         level = None
         for item in reversed(BreakingRank):
-            items = self.rank(item)
-            if items:
+            if counts.get(item):
                 if not level:
                     level = item
-                changesCount[item] = len(items)
+                changesCount[item] = counts[item]
         level = level or BreakingRank.Compatible
         return level, changesCount
 
     def rank(self, /, rank: BreakingRank):
-        return [x for x in self.entries.values() if x.rank == rank]
+        self._index()
+        return [self.inflate(x) for x in self._ranks.get(rank, [])]
 
     def breaking(self, /, rank: BreakingRank):
-        return [x for x in self.entries.values() if x.rank >= rank]
+        self._index()
+        if rank not in self._breaking:
+            self._breaking[rank] = [x for x in self.entries.values() if x.rank >= rank]
+        return [self.inflate(x) for x in self._breaking[rank]]
 
 
 class Report(PairProduct):
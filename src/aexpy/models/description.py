@@ -1,11 +1,13 @@
+import json
 from enum import IntEnum, IntFlag
 from functools import cached_property
-from typing import Annotated, Any, Literal
+from hashlib import blake2b
+from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 
 from ..utils import isPrivateName
-from .typing import TypeType
+from .typing import TypeRef, TypeType
 
 TRANSFER_BEGIN = "AEXPY_TRANSFER_BEGIN"
 
@@ -33,6 +35,32 @@ class ApiEntry(BaseModel):
     data: dict[str, Any] = {}
 
 
+FINGERPRINT_EXCLUDE = {
+    "docs",
+    "comments",
+    "src",
+    "location",
+    "data",
+    "subclasses",
+    "callers",
+    "callees",
+}
+"""Fields not compared by diff constraints, which do not affect fingerprints, data holds reprs changing on every extraction."""
+
+FINGERPRINT_UNORDERED = ("alias", "slots")
+"""Fields derived from sets, whose orders are not stable across extractions."""
+
+
+def fingerprint(entry: ApiEntry):
+    """Structural fingerprint of the entry, covering all fields compared by diff constraints."""
+
+    data = entry.model_dump(mode="json", exclude=FINGERPRINT_EXCLUDE)
+    for field in FINGERPRINT_UNORDERED:
+        if field in data:
+            data[field] = sorted(data[field])
+    return blake2b(json.dumps(data, sort_keys=True).encode(), digest_size=16).digest()
+
+
 class CollectionEntry(ApiEntry):
     members: dict[str, str] = {}
     slots: set[str] = set()
@@ -51,7 +79,7 @@ class ItemScope(IntEnum):
 
 class ItemEntry(ApiEntry):
     scope: ItemScope = ItemScope.Static
-    type: Annotated[TypeType, Field(discriminator="form")] | None = None
+    type: TypeRef | None = None
 
 
 class SpecialKind(IntEnum):
@@ -112,7 +140,7 @@ class Parameter(BaseModel):
     """Default value. None for variable default value."""
     optional: bool = False
     source: str = ""
-    type: Annotated[TypeType, Field(discriminator="form")] | None = None
+    type: TypeRef | None = None
 
     @cached_property
     def isKeyword(self, /):
@@ -150,7 +178,7 @@ class FunctionEntry(ItemEntry):
     returnAnnotation: str = ""
     parameters: list[Parameter] = []
     annotations: dict[str, str] = {}
-    returnType: Annotated[TypeType, Field(discriminator="form")] | None = None
+    returnType: TypeRef | None = None
     callers: list[str] = []
     callees: list[str] = []
     flags: FunctionFlag = FunctionFlag.Empty
@@ -212,3 +240,16 @@ def isPrivate(entry: ApiEntry):
         if not isPrivateName(alias):
             return False
     return True
+
+
+def entryTypes(entry: ApiEntry) -> list[TypeType]:
+    """Types of the entry: the type of items, and the return and parameter types of functions."""
+
+    result: list[TypeType] = []
+    if isinstance(entry, ItemEntry) and entry.type is not None:
+        result.append(entry.type)
+    if isinstance(entry, FunctionEntry):
+        if entry.returnType is not None:
+            result.append(entry.returnType)
+        result.extend(para.type for para in entry.parameters if para.type is not None)
+    return result
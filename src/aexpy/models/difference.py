@@ -22,3 +22,19 @@ class DiffEntry(BaseModel):
     data: dict[str, Any] = {}
     old: Annotated[ApiEntryType, Field(discriminator="form")] | None = None
     new: Annotated[ApiEntryType, Field(discriminator="form")] | None = None
+    oldId: str = ""
+    """Id of the old entry, set when old is omitted in slim mode."""
+    newId: str = ""
+    """Id of the new entry, set when new is omitted in slim mode."""
+
+    def slim(self, /):
+        """Return a copy referring to the old and new entries by ids only."""
+
+        return self.model_copy(
+            update={
+                "old": None,
+                "new": None,
+                "oldId": self.old.id if self.old is not None else self.oldId,
+                "newId": self.new.id if self.new is not None else self.newId,
+            }
+        )
@@ -1,16 +1,63 @@
-from typing import Literal
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Annotated, Any, Literal
 
-from pydantic import BaseModel
+from pydantic import (BaseModel, BeforeValidator, Field, SerializationInfo,
+                      SerializerFunctionWrapHandler, TypeAdapter,
+                      WrapSerializer)
 
 from ..utils import getObjectId
 
+PAYLOAD_PREFIX = "aexpy-type:"
+
 type TypeType = "NoneType | AnyType | UnknownType | LiteralType | ClassType | ProductType | SumType | CallableType | GenericType"
 
+_references: ContextVar["TypeTable | None"] = ContextVar("_references", default=None)
+"""Type table of the API description being serialized or validated, see `referencing`."""
+
+
+@contextmanager
+def referencing(table: "TypeTable"):
+    """Serialize (to JSON) and validate types in the context as indices in the type table, see `TypeRef`."""
+
+    token = _references.set(table)
+    try:
+        yield table
+    finally:
+        _references.reset(token)
+
+
+def dumpReference(
+    type: Any, handler: SerializerFunctionWrapHandler, info: SerializationInfo
+):
+    table = _references.get()
+    if table is None or not info.mode_is_json():
+        return handler(type)
+    return table.index(type)
+
+
+def loadReference(value: Any):
+    table = _references.get()
+    if table is not None and isinstance(value, int):
+        return table.types[value]
+    return value
+
+
+type TypeRef = Annotated[
+    TypeType,
+    Field(discriminator="form"),
+    BeforeValidator(loadReference),
+    WrapSerializer(dumpReference),
+]
+"""Type field, stored as an index in the type table when referencing (see `referencing`), or the type itself."""
+
 
 class Type(BaseModel):
     id: str = ""
     raw: str = ""
     data: dict | str = ""
+    """Serialized mypy type, or a reference (PAYLOAD_PREFIX + key) into ApiDescription.typePayloads."""
 
 
 class NoneType(Type):
@@ -53,7 +100,7 @@ class ClassType(Type):
 
 class SumType(Type):
     form: Literal["sum"] = "sum"
-    types: list[TypeType] = []
+    types: list[TypeRef] = []
 
     def __str__(self, /):
         return f"[{' | '.join(str(t) for t in self.types)}]"
@@ -61,7 +108,7 @@ class SumType(Type):
 
 class ProductType(Type):
     form: Literal["product"] = "product"
-    types: list[TypeType] = []
+    types: list[TypeRef] = []
 
     def __str__(self, /):
         return f"({' , '.join(str(t) for t in self.types)})"
@@ -69,8 +116,8 @@ class ProductType(Type):
 
 class CallableType(Type):
     form: Literal["callable"] = "callable"
-    args: TypeType = UnknownType()
-    ret: TypeType = UnknownType()
+    args: TypeRef = UnknownType()
+    ret: TypeRef = UnknownType()
 
     def __str__(self, /):
         return f"{str(self.args)} -> {str(self.ret)}"
@@ -78,8 +125,8 @@ class CallableType(Type):
 
 class GenericType(Type):
     form: Literal["generic"] = "generic"
-    base: TypeType = UnknownType()
-    vars: list[TypeType] = []
+    base: TypeRef = UnknownType()
+    vars: list[TypeRef] = []
 
     def __str__(self, /):
         return f"{str(self.base)}<{' , '.join(str(t) for t in self.vars)}>"
@@ -141,3 +188,132 @@ class TypeFactory:
         if instance is None:
             return cls.none()
         return cls.fromType(type(instance))
+
+
+def children(type: TypeType) -> list[TypeType]:
+    match type:
+        case SumType() | ProductType():
+            return type.types
+        case CallableType():
+            return [type.args, type.ret]
+        case GenericType():
+            return [type.base, *type.vars]
+        case _:
+            return []
+
+
+def withChildren(type: TypeType, items: list[TypeType]) -> TypeType:
+    """Return a copy of the type with the children (in the order of `children`) replaced."""
+
+    match type:
+        case SumType() | ProductType():
+            return type.model_copy(update={"types": items})
+        case CallableType():
+            return type.model_copy(update={"args": items[0], "ret": items[1]})
+        case GenericType():
+            return type.model_copy(update={"base": items[0], "vars": items[1:]})
+        case _:
+            return type
+
+
+class TypeTable:
+    """
+    Hash-consing table of types, structurally equal types are interned as the same object.
+
+    Interned types of the same table are equal if and only if they are identical. They are shared, do not modify them in place.
+    """
+
+    def __init__(self, /) -> None:
+        self.types: list[TypeType] = []
+        self.keys: dict[tuple, int] = {}
+        """Index from the structural key (with the indices of children) to the type index."""
+        self.indices: dict[int, int] = {}
+        """Index from the identity of an interned type to the type index."""
+        self.names: dict[int, str] = {}
+        """Cache for the string forms of types, by index."""
+
+    def __len__(self, /):
+        return len(self.types)
+
+    def __contains__(self, /, type: TypeType):
+        return id(type) in self.indices
+
+    def index(self, /, type: TypeType) -> int:
+        """Intern the type and return its index in the table, objects not interned are keyed by their structures on every call."""
+
+        result = self.indices.get(id(type))
+        if result is not None:
+            return result
+        items = children(type)
+        indices = [self.index(t) for t in items]
+        match type:
+            case LiteralType():
+                value = type.value
+            case UnknownType():
+                value = type.message
+            case _:
+                value = ""
+        data = type.data if isinstance(type.data, str) else json.dumps(type.data)
+        key = (type.form, type.id, type.raw, data, value, tuple(indices))
+        result = self.keys.get(key)
+        if result is None:
+            interned = [self.types[i] for i in indices]
+            if any(a is not b for a, b in zip(items, interned)):
+                type = withChildren(type, interned)
+            result = self.keys[key] = len(self.types)
+            self.types.append(type)
+            self.indices[id(type)] = result
+        return result
+
+    def find(self, /, type: TypeType) -> int | None:
+        """Return the index of an interned type, or None for other objects, even if an equal type is interned."""
+
+        return self.indices.get(id(type))
+
+    def dump(self, /) -> list[dict]:
+        """Serialize the types, whose children are indices in the table, see `load`."""
+
+        with referencing(self):
+            return [type.model_dump(mode="json") for type in self.types]
+
+    @classmethod
+    def load(cls, /, rows: list[dict]):
+        """Rebuild the table from serialized types, see `dump`."""
+
+        table = cls()
+        with referencing(table):
+            for i, row in enumerate(rows):
+                if table.index(_typeAdapter.validate_python(row)) != i:
+                    raise ValueError(f"Duplicate type {i} in the type table.")
+        return table
+
+    def intern(self, /, type: TypeType) -> TypeType:
+        return self.types[self.index(type)]
+
+    def name(self, /, type: TypeType):
+        """Return the string form of the type, cached for interned types."""
+
+        index = self.index(type)
+        result = self.names.get(index)
+        if result is None:
+            result = self.names[index] = str(self.types[index])
+        return result
+
+    def canonical(self, /, type: TypeType) -> TypeType:
+        """
+        Return the interned canonical form of the type, where sum types are flattened and deduplicated.
+
+        Members keep their first order, since the string form of a type is its id, which is compared across releases.
+        """
+
+        items = [self.canonical(t) for t in children(type)]
+        if isinstance(type, SumType):
+            members: dict[int, TypeType] = {}
+            for item in items:
+                for t in item.types if isinstance(item, SumType) else [item]:
+                    members.setdefault(id(t), t)
+            items = list(members.values())
+        return self.intern(withChildren(type, items) if items else type)
+
+
+_typeAdapter: TypeAdapter[TypeType] = TypeAdapter(TypeRef)
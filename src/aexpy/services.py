@@ -1,5 +1,9 @@
+import logging
+import multiprocessing
+import os
 from contextlib import contextmanager
 from logging import Logger
+from typing import Iterable, Iterator
 
 from . import SHORT_COMMIT_ID, __version__
 from .diffing import Differ
@@ -112,6 +116,53 @@ class ServiceProvider:
                 producer.diff(old, new, context.product)
         return context
 
+    def diffSeries(
+        self,
+        /,
+        descriptions: Iterable[ApiDescription],
+        *,
+        logger: Logger | None = None,
+        workers: int = 1,
+    ) -> Iterator[ProduceContext[ApiDifference]]:
+        """
+        Diff each pair of adjacent descriptions in an ordered release series, and yield the differences in order.
+
+        Descriptions are consumed lazily (e.g. from a generator loading files), so each is loaded once,
+        and only a sliding window of them is kept: 2, or workers + 1 when diffing pairs in parallel processes.
+        """
+
+        if workers > 1 and "fork" not in multiprocessing.get_all_start_methods():
+            (logger or logging.getLogger()).warning(
+                "Parallel diff requires fork, diff serially."
+            )
+            workers = 1
+        window: list[ApiDescription] = []
+        for description in descriptions:
+            window.append(description)
+            if len(window) > workers:
+                yield from self._diffWindow(window, logger, workers)
+                window = window[-1:]
+        if len(window) > 1:
+            yield from self._diffWindow(window, logger, workers)
+
+    def _diffWindow(
+        self, /, window: list[ApiDescription], logger: Logger | None, workers: int
+    ):
+        pairs = list(zip(window, window[1:]))
+        if workers <= 1 or len(pairs) <= 1:
+            return [self.diff(old, new, logger=logger) for old, new in pairs]
+
+        global _shared
+
+        _shared = self, pairs, logger
+        try:
+            with multiprocessing.get_context("fork").Pool(
+                min(workers, len(pairs))
+            ) as pool:
+                return pool.map(_diffSharedPair, range(len(pairs)))
+        finally:
+            _shared = None
+
     def report(
         self,
         /,
@@ -130,6 +181,23 @@ class ServiceProvider:
         return context
 
 
+type SharedPairs = tuple[
+    ServiceProvider, list[tuple[ApiDescription, ApiDescription]], Logger | None
+]
+
+_shared: SharedPairs | None = None
+"""Service and description pairs shared with forked workers."""
+
+
+def _diffSharedPair(index: int):
+    assert _shared is not None, "No shared pairs in worker."
+    service, pairs, logger = _shared
+    # workers are daemonic and cannot fork a pool for the differ again
+    os.environ["AEXPY_DIFF_WORKERS"] = "1"
+    old, new = pairs[index]
+    return service.diff(old, new, logger=logger)
+
+
 def getService():
     return ServiceProvider()
 
@@ -1,6 +1,8 @@
 from pathlib import Path
 
 from .. import utils
+from ..io.blobs import BlobStore
+from ..io.deltas import DeltaApiStore
 from ..models import Release, ReleasePair
 
 
@@ -58,6 +60,20 @@ class DistPathBuilder:
     def reportDir(self, /, project: str):
         return self.projectDir(project) / "reports"
 
+    def blobDir(self, /, project: str):
+        return self.projectDir(project) / "blobs"
+
+    def blobStore(self, /, project: str):
+        """Blob store shared by all releases of the project, externalize API descriptions with base=apiDir(project)."""
+        return BlobStore(self.blobDir(project))
+
+    def deltaDir(self, /, project: str):
+        return self.projectDir(project) / "apideltas"
+
+    def deltaStore(self, /, project: str):
+        """Delta-encoded API descriptions of the release series of the project."""
+        return DeltaApiStore(self.deltaDir(project))
+
     def distributions(self, /, project: str):
         dir = self.distributionDir(project)
         if not dir.is_dir():
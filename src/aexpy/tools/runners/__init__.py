@@ -1,4 +1,3 @@
-import gzip
 import logging
 import os
 import shutil
@@ -13,7 +12,7 @@ from ... import __version__, getEnvironmentManager
 from ...cli import CliOptions
 from ...diffing import Differ
 from ...extracting import Extractor
-from ...io import StreamProductSaver
+from ...io import StreamProductSaver, load
 from ...models import (ApiDescription, ApiDifference, Distribution, Product,
                        Report)
 from ...producers import Producer
@@ -65,6 +64,8 @@ class AexPyRunner:
                 **os.environ,
                 "PYTHONUTF8": "1",
                 "AEXPY_GZIP_IO": "1" if self.cli.compress else "0",
+                "AEXPY_ZSTD_IO": "1" if self.cli.zstd else "0",
+                "AEXPY_FORMAT_IO": self.cli.format,
                 "AEXPY_ENV_PROVIDER": getEnvironmentManager(),
             },
         )
@@ -81,10 +82,7 @@ class AexPyRunner:
         res = self.run(args + ["-"], **kwargs)
         result = AexPyResult[T](code=res.returncode, log=res.stderr, out=res.stdout)
         try:
-            if self.cli.compress:
-                result.data = type.model_validate_json(gzip.decompress(result.out))
-            else:
-                result.data = type.model_validate_json(result.out)
+            result.data = load(result.out, type)
         except Exception:
             self.logger.error("Failed to parse aexpy output", exc_info=True)
             self.logger.warning(result.out)
@@ -38,7 +38,9 @@ def stat(ctx: click.Context, files: tuple[Path], output: IO[bytes]):
             worker.count(files, context.product)
 
     result = context.product
-    StreamProductSaver(output, gzip=clictx.compress).save(result, context.log)
+    StreamProductSaver(
+        output, gzip=clictx.compress, format=clictx.format, zstd=clictx.zstd
+    ).save(result, context.log)
 
     print(result.overview(), file=sys.stderr)
 
@@ -0,0 +1,384 @@
+"""
+Product stores, indexing the products of projects by release (pair), kind, state, duration and producer.
+
+DirectoryProductStore keeps the file tree of DistPathBuilder, whose queries need to glob directories and load products.
+SqliteProductStore indexes products in a SQLite database, and stores the payloads in it or links to existing files.
+
+Use `aexpy tool store-index` to index a directory tree into a SQLite store, and `aexpy tool store-query` to query stores.
+"""
+
+import sqlite3
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from io import BytesIO
+from pathlib import Path
+from typing import Iterable, Literal, override
+
+from pydantic import BaseModel
+
+from ...io import (FileProductIO, ProductFormat, StreamProductSaver, load,
+                   readBytes)
+from ...models import (ApiDescription, ApiDifference, Distribution,
+                       PairProduct, ProduceState, Product, Release,
+                       ReleasePair, Report, SingleProduct)
+from ...utils import ensureDirectory
+from ..paths import DistPathBuilder
+
+type ProductKind = Literal["preprocess", "extract", "diff", "report"]
+
+PRODUCT_KINDS: dict[ProductKind, type[Product]] = {
+    "preprocess": Distribution,
+    "extract": ApiDescription,
+    "diff": ApiDifference,
+    "report": Report,
+}
+
+PAIR_KINDS: set[ProductKind] = {"diff", "report"}
+
+
+def productKind(product: Product) -> ProductKind:
+    for kind, cls in PRODUCT_KINDS.items():
+        if isinstance(product, cls):
+            return kind
+    assert False, f"Unknown product type: {type(product)}"
+
+
+def productTarget(product: Product) -> Release | ReleasePair:
+    if isinstance(product, SingleProduct):
+        return product.single()
+    assert isinstance(product, PairProduct), f"Not a stored product: {product}"
+    return product.pair()
+
+
+def targetKey(target: Release | ReleasePair) -> tuple[str, str]:
+    """Project and version (old&new for release pairs, as file stems in DistPathBuilder)."""
+
+    if isinstance(target, Release):
+        return target.project, target.version
+    assert (
+        target.old.project == target.new.project
+    ), f"ReleasePair not same project: {target}"
+    return target.old.project, f"{target.old.version}&{target.new.version}"
+
+
+class ProductRecord(BaseModel):
+    project: str
+    version: str
+    """Release version, or old&new versions for diff and report."""
+    kind: ProductKind
+    state: ProduceState = ProduceState.Pending
+    duration: timedelta = timedelta(seconds=0)
+    producer: str = ""
+    creation: datetime = datetime.min
+    path: Path | None = None
+    """Linked payload file, None if the payload is stored in the store."""
+
+    @classmethod
+    def fromProduct(cls, /, product: Product, path: Path | None = None):
+        project, version = targetKey(productTarget(product))
+        return cls(
+            project=project,
+            version=version,
+            kind=productKind(product),
+            state=product.state,
+            duration=product.duration,
+            producer=product.producer,
+            creation=product.creation,
+            path=path,
+        )
+
+    @property
+    def target(self, /) -> Release | ReleasePair:
+        if self.kind in PAIR_KINDS:
+            old, new = self.version.split("&", maxsplit=1)
+            return ReleasePair(
+                old=Release(project=self.project, version=old),
+                new=Release(project=self.project, version=new),
+            )
+        return Release(project=self.project, version=self.version)
+
+
+class ProductStore(ABC):
+    @abstractmethod
+    def save(self, /, product: Product, log: str = "") -> ProductRecord: ...
+
+    @abstractmethod
+    def raw(
+        self, /, kind: ProductKind, target: Release | ReleasePair
+    ) -> tuple[bytes, bytes] | None:
+        """Payload and log of the product, None if not stored."""
+        ...
+
+    @abstractmethod
+    def query(
+        self,
+        /,
+        project: str | None = None,
+        kind: ProductKind | None = None,
+        state: ProduceState | None = None,
+        producer: str | None = None,
+        minDuration: timedelta | None = None,
+    ) -> Iterable[ProductRecord]: ...
+
+    @abstractmethod
+    def projects(self, /) -> Iterable[str]: ...
+
+    def load[P: Product](
+        self, /, kind: ProductKind, target: Release | ReleasePair, cls: type[P]
+    ) -> P | None:
+        raw = self.raw(kind, target)
+        return load(raw[0], cls) if raw is not None else None
+
+    def log(self, /, kind: ProductKind, target: Release | ReleasePair):
+        raw = self.raw(kind, target)
+        return raw[1].decode() if raw is not None else ""
+
+    def __contains__(self, /, item: tuple[ProductKind, Release | ReleasePair]):
+        return self.raw(*item) is not None
+
+    def releases(self, /, project: str, kind: ProductKind):
+        return (record.target for record in self.query(project=project, kind=kind))
+
+    def distributions(self, /, project: str):
+        return self.releases(project, "preprocess")
+
+    def apis(self, /, project: str):
+        return self.releases(project, "extract")
+
+    def changes(self, /, project: str):
+        return self.releases(project, "diff")
+
+    def reports(self, /, project: str):
+        return self.releases(project, "report")
+
+
+class DirectoryProductStore(ProductStore):
+    """Products as files in the DistPathBuilder tree, logs are saved next to products with the .log suffix."""
+
+    def __init__(self, /, root: Path, format: ProductFormat = "json") -> None:
+        self.paths = DistPathBuilder(root)
+        self.format = format
+
+    def path(self, /, kind: ProductKind, target: Release | ReleasePair):
+        if kind in PAIR_KINDS:
+            assert isinstance(target, ReleasePair)
+            return (
+                self.paths.diff(target) if kind == "diff" else self.paths.report(target)
+            )
+        assert isinstance(target, Release)
+        return (
+            self.paths.preprocess(target)
+            if kind == "preprocess"
+            else self.paths.extract(target)
+        )
+
+    def files(self, /, project: str, kind: ProductKind):
+        targets = {
+            "preprocess": self.paths.distributions,
+            "extract": self.paths.apis,
+            "diff": self.paths.changes,
+            "report": self.paths.reports,
+        }[kind](project)
+        for target in targets:
+            yield self.path(kind, target)
+
+    @override
+    def save(self, /, product, log=""):
+        path = self.path(productKind(product), productTarget(product))
+        FileProductIO(path, path.with_suffix(".log"), self.format).save(product, log)
+        return ProductRecord.fromProduct(product, path)
+
+    @override
+    def raw(self, /, kind, target):
+        path = self.path(kind, target)
+        if not path.is_file():
+            return None
+        logFile = path.with_suffix(".log")
+        return readBytes(path), readBytes(logFile) if logFile.is_file() else b""
+
+    @override
+    def query(
+        self,
+        /,
+        project=None,
+        kind=None,
+        state=None,
+        producer=None,
+        minDuration=None,
+    ):
+        # metadata is only available in the payloads
+        for proj in [project] if project is not None else self.projects():
+            for k in [kind] if kind is not None else PRODUCT_KINDS:
+                for path in self.files(proj, k):
+                    if not path.is_file():
+                        continue
+                    record = ProductRecord.fromProduct(
+                        load(path, PRODUCT_KINDS[k]), path
+                    )
+                    if state is not None and record.state != state:
+                        continue
+                    if producer is not None and record.producer != producer:
+                        continue
+                    if minDuration is not None and record.duration < minDuration:
+                        continue
+                    yield record
+
+    @override
+    def projects(self, /):
+        return self.paths.projects()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    project TEXT NOT NULL,
+    version TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    state INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    producer TEXT NOT NULL,
+    creation TEXT NOT NULL,
+    path TEXT,
+    logPath TEXT,
+    payload BLOB,
+    log BLOB,
+    PRIMARY KEY (project, kind, version)
+);
+CREATE INDEX IF NOT EXISTS products_state ON products (project, kind, state);
+CREATE INDEX IF NOT EXISTS products_producer ON products (producer, kind);
+CREATE INDEX IF NOT EXISTS products_kind_state ON products (kind, state);
+"""
+
+_RECORD_COLUMNS = "project, version, kind, state, duration, producer, creation, path"
+
+
+class SqliteProductStore(ProductStore):
+    """Products indexed in a SQLite database, with payloads stored inline or linked to files."""
+
+    def __init__(self, /, db: Path, format: ProductFormat = "json") -> None:
+        self.db = db
+        self.format = format
+        ensureDirectory(db.parent)
+        self.connection = sqlite3.connect(db)
+        with self.connection:
+            self.connection.executescript(_SCHEMA)
+
+    def close(self, /):
+        self.connection.close()
+
+    def dump(self, /, product: Product, log: str):
+        payload = BytesIO()
+        logStream = BytesIO()
+        StreamProductSaver(payload, logStream, self.format).save(product, log)
+        return payload.getvalue(), logStream.getvalue()
+
+    def put(
+        self,
+        /,
+        record: ProductRecord,
+        payload: bytes | None = None,
+        log: bytes | None = None,
+        logPath: Path | None = None,
+    ):
+        with self.connection:
+            self.connection.execute(
+                f"INSERT OR REPLACE INTO products ({_RECORD_COLUMNS}, logPath, payload, log) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.project,
+                    record.version,
+                    record.kind,
+                    int(record.state),
+                    record.duration.total_seconds(),
+                    record.producer,
+                    record.creation.isoformat(),
+                    str(record.path) if record.path else None,
+                    str(logPath) if logPath else None,
+                    payload,
+                    log,
+                ),
+            )
+        return record
+
+    @override
+    def save(self, /, product, log=""):
+        payload, logData = self.dump(product, log)
+        return self.put(ProductRecord.fromProduct(product), payload, logData)
+
+    def link(self, /, product: Product, path: Path, logFile: Path | None = None):
+        """Index the product whose payload is the file at path (and the log file), without copying them."""
+
+        return self.put(
+            ProductRecord.fromProduct(product, path.resolve()),
+            logPath=logFile.resolve() if logFile else None,
+        )
+
+    def index(self, /, store: DirectoryProductStore):
+        """Index all products in a directory store by linking."""
+
+        count = 0
+        for record in store.query():
+            assert record.path is not None
+            logFile = record.path.with_suffix(".log")
+            self.put(record, logPath=logFile if logFile.is_file() else None)
+            count += 1
+        return count
+
+    @override
+    def raw(self, /, kind, target):
+        project, version = targetKey(target)
+        row = self.connection.execute(
+            "SELECT path, logPath, payload, log FROM products WHERE project = ? AND kind = ? AND version = ?",
+            (project, kind, version),
+        ).fetchone()
+        if row is None:
+            return None
+        path, logPath, payload, log = row
+        if path is not None:
+            return readBytes(Path(path)), readBytes(Path(logPath)) if logPath else b""
+        return payload, log or b""
+
+    @override
+    def query(
+        self,
+        /,
+        project=None,
+        kind=None,
+        state=None,
+        producer=None,
+        minDuration=None,
+    ):
+        conditions: list[str] = []
+        params: list = []
+        for column, value in (
+            ("project", project),
+            ("kind", kind),
+            ("state", int(state) if state is not None else None),
+            ("producer", producer),
+        ):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if minDuration is not None:
+            conditions.append("duration >= ?")
+            params.append(minDuration.total_seconds())
+        sql = f"SELECT {_RECORD_COLUMNS} FROM products"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        for row in self.connection.execute(sql, params):
+            project, version, kind, state, duration, producer, creation, path = row
+            yield ProductRecord(
+                project=project,
+                version=version,
+                kind=kind,
+                state=ProduceState(state),
+                duration=timedelta(seconds=duration),
+                producer=producer,
+                creation=datetime.fromisoformat(creation),
+                path=Path(path) if path else None,
+            )
+
+    @override
+    def projects(self, /):
+        return [
+            row[0]
+            for row in self.connection.execute("SELECT DISTINCT project FROM products")
+        ]
@@ -0,0 +1,105 @@
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import click
+
+from ...models import ProduceState
+from . import (PRODUCT_KINDS, DirectoryProductStore, ProductKind,
+               SqliteProductStore)
+
+
+@click.command("store-index")
+@click.argument(
+    "root",
+    type=click.Path(
+        exists=True, dir_okay=True, file_okay=False, resolve_path=True, path_type=Path
+    ),
+)
+@click.argument(
+    "db",
+    type=click.Path(dir_okay=False, file_okay=True, resolve_path=True, path_type=Path),
+)
+def storeIndex(root: Path, db: Path):
+    """Index produced data in a directory into a SQLite product store.
+
+    ROOT describes the directory of produced data (projects/{distributions,apis,changes,reports}/*.json).
+
+    DB describes the SQLite database, products are linked instead of copied.
+
+    Examples:
+
+    aexpy tool store-index ./data products.db
+    """
+
+    store = SqliteProductStore(db)
+    try:
+        count = store.index(DirectoryProductStore(root))
+    finally:
+        store.close()
+    print(f"Indexed {count} products into {db}.", file=sys.stderr)
+
+
+@click.command("store-query")
+@click.argument(
+    "store",
+    type=click.Path(exists=True, resolve_path=True, path_type=Path),
+)
+@click.option("-p", "--project", default=None, help="Project name.")
+@click.option(
+    "-k",
+    "--kind",
+    type=click.Choice(list(PRODUCT_KINDS)),
+    default=None,
+    help="Product kind.",
+)
+@click.option(
+    "-s",
+    "--state",
+    type=click.Choice([state.name.lower() for state in ProduceState]),
+    default=None,
+    help="Produce state.",
+)
+@click.option("--producer", default=None, help="Producer name.")
+@click.option(
+    "--min-duration",
+    type=float,
+    default=None,
+    help="Minimum duration in seconds.",
+)
+def storeQuery(
+    store: Path,
+    project: str | None = None,
+    kind: ProductKind | None = None,
+    state: str | None = None,
+    producer: str | None = None,
+    min_duration: float | None = None,
+):
+    """Query products in a product store.
+
+    STORE describes a SQLite product store (created by store-index), or a directory of produced data (which loads all matched products).
+
+    Matched products are printed as JSON lines.
+
+    Examples:
+
+    aexpy tool store-query products.db -p click -k extract -s failure
+    """
+
+    products = (
+        DirectoryProductStore(store) if store.is_dir() else SqliteProductStore(store)
+    )
+    try:
+        for record in products.query(
+            project=project,
+            kind=kind,
+            state=ProduceState[state.capitalize()] if state is not None else None,
+            producer=producer,
+            minDuration=(
+                timedelta(seconds=min_duration) if min_duration is not None else None
+            ),
+        ):
+            print(record.model_dump_json())
+    finally:
+        if isinstance(products, SqliteProductStore):
+            products.close()
@@ -0,0 +1 @@
+"""Tools for the zstd compression of products."""
@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+import click
+
+from ...io import readBytes
+from ...io.zstd import DEFAULT_DICT_SIZE, trainDictionary
+
+
+@click.command("zstd-dict")
+@click.argument(
+    "files",
+    nargs=-1,
+    type=click.Path(
+        exists=True, dir_okay=False, file_okay=True, resolve_path=True, path_type=Path
+    ),
+)
+@click.argument(
+    "output",
+    type=click.Path(dir_okay=False, file_okay=True, resolve_path=True, path_type=Path),
+)
+@click.option(
+    "-s",
+    "--size",
+    type=int,
+    default=DEFAULT_DICT_SIZE,
+    help="Dictionary size in bytes.",
+)
+def zstdDict(files: tuple[Path], output: Path, size: int = DEFAULT_DICT_SIZE):
+    """Train a zstd dictionary from produced data.
+
+    FILES give paths to produced data (json or indexed, maybe compressed) for training.
+
+    OUTPUT describes the output dictionary file, use it by `--zstd-dict` or the AEXPY_ZSTD_DICT environment variable.
+
+    Examples:
+
+    aexpy tool zstd-dict data/*.json aexpy.dict
+
+    aexpy --zstd --zstd-dict aexpy.dict extract -j dist.json api.json
+    """
+
+    data = trainDictionary(readBytes(file) for file in files)
+    output.write_bytes(data)
+    print(
+        f"Trained dictionary ({len(data)} bytes) from {len(files)} files.",
+        file=sys.stderr,
+    )
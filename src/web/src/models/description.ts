@@ -257,4 +257,54 @@ export function loadApiEntry(data: any): ApiEntry {
             throw new Error("Unknown schema: " + data.schema);
     }
     return entry.from(data);
-}
\ No newline at end of file
+}
+export const PAYLOAD_PREFIX = "aexpy-type:";
+
+export function loadTypeTable(rows: any[]): any[] {
+    // types of API descriptions are stored once in the type table, children and entries refer to them by indices
+    let table: any[] = [];
+    let resolve = (type: any) => typeof type === "number" ? table[type] : type;
+    for (let row of rows) {
+        let type = { ...row };
+        for (let key of ["args", "ret", "base"]) {
+            if (key in type) {
+                type[key] = resolve(type[key]);
+            }
+        }
+        for (let key of ["types", "vars"]) {
+            if (Array.isArray(type[key])) {
+                type[key] = type[key].map(resolve);
+            }
+        }
+        table.push(type);
+    }
+    return table;
+}
+
+export function resolveTypePayloads(entry: ApiEntry, payloads: { [key: string]: any }, table: any[] = []): ApiEntry {
+    // serialized mypy types are stored once in the payload table of the product, referenced by PAYLOAD_PREFIX + key
+    let resolve = (type: any) => typeof type === "number" ? table[type] : type;
+    let types: any[] = [];
+    if (entry instanceof ItemEntry && entry.type != undefined) {
+        entry.type = resolve(entry.type);
+        types.push(entry.type);
+    }
+    if (entry instanceof FunctionEntry) {
+        if (entry.returnType != undefined) {
+            entry.returnType = resolve(entry.returnType);
+            types.push(entry.returnType);
+        }
+        for (let para of entry.parameters) {
+            if (para.type != undefined) {
+                para.type = resolve(para.type);
+                types.push(para.type);
+            }
+        }
+    }
+    for (let type of types) {
+        if (typeof type.data === "string" && type.data.startsWith(PAYLOAD_PREFIX)) {
+            type.data = payloads[type.data.substring(PAYLOAD_PREFIX.length)] ?? type.data;
+        }
+    }
+    return entry;
+}
@@ -1,5 +1,5 @@
 import { store } from "../services/store";
-import { ApiEntry, AttributeEntry, ClassEntry, FunctionEntry, ItemEntry, loadApiEntry, ModuleEntry, SpecialEntry } from "./description";
+import { ApiEntry, AttributeEntry, ClassEntry, FunctionEntry, ItemEntry, loadApiEntry, loadTypeTable, ModuleEntry, resolveTypePayloads, SpecialEntry } from "./description";
 import { BreakingRank, DiffEntry } from "./difference";
 import { parse as durationParse } from "tinyduration";
 
@@ -192,6 +192,11 @@ export class ApiDescription extends Product {
                 this.specials[key] = new SpecialEntry().from(data.specials[key]);
             }
         }
+        let payloads = data.typePayloads ?? {};
+        let types = loadTypeTable(data.types ?? []);
+        for (let entry of this.entries()) {
+            resolveTypePayloads(entry, payloads, types);
+        }
     }
 
     entry(id: string) {
@@ -269,9 +274,16 @@ export class ApiDifference extends Product {
         this.old.from(data.old ?? {});
         this.new.from(data.new ?? {});
         if (data.entries != undefined) {
+            let payloads = data.typePayloads ?? {};
             for (let key in <{ [key: string]: any }>data.entries) {
                 let entry = new DiffEntry();
                 entry.from(data.entries[key]);
+                if (entry.old) {
+                    resolveTypePayloads(entry.old, payloads);
+                }
+                if (entry.new) {
+                    resolveTypePayloads(entry.new, payloads);
+                }
                 this.entries[entry.id] = entry;
             }
         }
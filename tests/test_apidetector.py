@@ -0,0 +1,65 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from aexpy.apidetector.__main__ import dumpEntries, main, mainSharded, merge
+from aexpy.apidetector.compat import Distribution
+
+PACKAGE = "aexpyshardtest"
+
+
+@pytest.fixture
+def package(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    root = tmp_path / PACKAGE
+    root.mkdir()
+    # submodules are not reachable from the package, so a shard only visits its own modules
+    (root / "__init__.py").write_text("def __dir__():\n    return []\n")
+    # re-exports from a module in another shard
+    (root / "a.py").write_text("from .z import C, g\n\ny: int = 1\n")
+    (root / "z.py").write_text(
+        '__all__ = ["f", "C"]\n\n\ndef f(): ...\n\n\ndef g(): ...\n\n\n'
+        "class C:\n    x: int\n\n    def m(self): ...\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv(
+        "PYTHONPATH", str(Path(__file__).parent.parent / "src"), prepend=":"
+    )
+    yield Distribution(rootPath=tmp_path, topModules=[PACKAGE])
+    for name in list(sys.modules):
+        if name.split(".")[0] == PACKAGE:
+            del sys.modules[name]
+
+
+def normalize(entries):
+    result = {}
+    for entry in entries:
+        entry["data"] = {}
+        if "slots" in entry:
+            entry["slots"] = sorted(entry["slots"])
+        result[entry["id"]] = entry
+    return result
+
+
+def test_sharded(package: Distribution):
+    serial = normalize(json.loads(dumpEntries(main(package))))
+    sharded = normalize(mainSharded(package, 2))
+    assert serial[f"{PACKAGE}.z.g"]["private"]
+    assert sharded == serial
+
+
+def test_merge():
+    reexported = {
+        "id": "m.z.C.x",
+        "private": False,
+        "scope": 0,
+        "annotation": "",
+        "alias": ["m.a.C.x"],
+    }
+    owned = dict(reexported, private=True, scope=2, annotation="int", alias=["m.z.D.x"])
+    for shards in ([reexported, owned], [owned, reexported]):
+        entries = {}
+        for entry in shards:
+            merge(entries, dict(entry))
+        assert entries["m.z.C.x"] == dict(owned, alias=["m.a.C.x", "m.z.D.x"])
@@ -0,0 +1,68 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from aexpy.io import StreamProductLoader, load
+from aexpy.io.blobs import (BLOB_DATABASE, MIN_BLOB_SIZE, BlobStore,
+                            externalize, isBlobRef)
+from aexpy.models import ApiDescription
+from aexpy.models.description import FunctionEntry
+
+
+def description():
+    api = ApiDescription()
+    api.add(FunctionEntry(id="m.f", name="f", src="def f(): ...\n" * 100, docs="f"))
+    api.add(FunctionEntry(id="m.g", name="g", src="def g(): ...\n" * 100))
+    return api
+
+
+def test_roundtrip(tmp_path: Path):
+    api = description()
+    store = BlobStore(tmp_path / "blobs")
+    externalized = externalize(api, store, tmp_path / "apis")
+
+    entry = externalized["m.f"]
+    assert entry is not None and isBlobRef(entry.src)
+    assert entry.docs == "f", "short texts are kept inline"
+    assert externalized.blobs == "../blobs"
+
+    file = tmp_path / "apis" / "api.json"
+    file.parent.mkdir()
+    file.write_text(externalized.model_dump_json())
+    with file.open("rb") as f:
+        streamed = StreamProductLoader(f).load(ApiDescription)
+    for loaded in (load(file), load(file, ApiDescription), streamed):
+        assert isinstance(loaded, ApiDescription)
+        assert not loaded.blobs
+        assert loaded.model_dump_json() == api.model_dump_json()
+
+
+def test_shared(tmp_path: Path):
+    externalize(description(), BlobStore(tmp_path))
+    size = (tmp_path / BLOB_DATABASE).stat().st_size
+    # another release with the same texts, through another store instance
+    externalize(description(), BlobStore(tmp_path))
+    assert (tmp_path / BLOB_DATABASE).stat().st_size == size
+    assert len("def f(): ...\n" * 100) >= MIN_BLOB_SIZE
+
+
+def test_moved(tmp_path: Path):
+    api = description()
+    file = tmp_path / "data" / "apis" / "api.json"
+    file.parent.mkdir(parents=True)
+    file.write_text(
+        externalize(
+            api, BlobStore(tmp_path / "data" / "blobs"), file.parent
+        ).model_dump_json()
+    )
+
+    # e.g. mounted at another path
+    shutil.move(tmp_path / "data", tmp_path / "moved")
+    loaded = load(tmp_path / "moved" / "apis" / "api.json")
+    assert loaded.model_dump_json() == api.model_dump_json()
+
+    shutil.rmtree(tmp_path / "moved" / "blobs")
+    with pytest.raises(FileNotFoundError, match="not found"):
+        load(tmp_path / "moved" / "apis" / "api.json")
+    assert not (tmp_path / "moved" / "blobs").exists()
@@ -0,0 +1,81 @@
+from pathlib import Path
+
+from aexpy.io.deltas import DeltaApiStore
+from aexpy.models import ApiDescription, Distribution, Release
+from aexpy.models.description import (ClassEntry, FunctionEntry, Location,
+                                      fingerprint)
+from aexpy.models.typing import PAYLOAD_PREFIX, ClassType
+
+
+def description(version: str, line: int = 1, callees: list[str] | None = None):
+    api = ApiDescription(
+        distribution=Distribution(release=Release(project="m", version=version))
+    )
+    api.add(
+        FunctionEntry(
+            id="m.f",
+            name="f",
+            location=Location(file="m.py", line=line),
+            callees=callees or ["m.g", "m.h"],
+            data={"raw": f"<function f at {line:#x}>"},
+            returnType=ClassType(id="m.C", data=PAYLOAD_PREFIX + "c"),
+        )
+    )
+    api.add(FunctionEntry(id="m.g", name="g"))
+    api.typePayloads = {"c": {"type": "m.C"}}
+    return api
+
+
+def test_unchanged(tmp_path: Path):
+    store = DeltaApiStore(tmp_path)
+    store.save(description("1"))
+    # re-extracted: volatile fields and set-derived orders differ
+    new = description("2", line=2, callees=["m.h", "m.g"])
+    delta = store.save(new)
+    assert not delta.entries and not delta.removed
+    assert not delta.payloads and delta.payloadKeys == ["c"]
+    assert set(delta.patches["m.f"]) == {"location", "callees", "data"}
+
+    store.cache.clear()
+    assert store.load("2").model_dump_json() == new.model_dump_json()
+
+
+def test_moved(tmp_path: Path):
+    store = DeltaApiStore(tmp_path)
+    # only locations move
+    saved = [description(str(version), line=version) for version in range(1, 4)]
+    for api in saved:
+        store.save(api)
+
+    store.cache.clear()
+    for api in reversed(saved):
+        loaded = store.load(api.distribution.release.version)
+        assert loaded.model_dump_json() == api.model_dump_json()
+    assert store.load("1")["m.f"].location == Location(file="m.py", line=1)
+
+
+def test_reconstruct(tmp_path: Path):
+    store = DeltaApiStore(tmp_path)
+    store.save(description("1"))
+    new = description("2")
+    new.add(FunctionEntry(id="m.k", name="k"))
+    new.typePayloads["k"] = "builtins.int"
+    delta = store.save(new)
+    assert [entry.id for entry in delta.entries] == ["m.k"]
+    assert delta.payloads == {"k": "builtins.int"}
+
+    store.cache.clear()
+    loaded = store.load("2")
+    assert loaded.model_dump_json() == new.model_dump_json()
+    assert store.load("1").typePayloads == {"c": {"type": "m.C"}}
+
+
+def test_fingerprint():
+    old = ClassEntry(
+        id="m.C", alias=["m.A", "m.B"], slots={"x", "y"}, data={"raw": "<class at 0x1>"}
+    )
+    new = ClassEntry(
+        id="m.C", alias=["m.B", "m.A"], slots={"y", "x"}, data={"raw": "<class at 0x2>"}
+    )
+    assert fingerprint(old) == fingerprint(new)
+    assert fingerprint(old) != fingerprint(old.model_copy(update={"bases": ["m.D"]}))
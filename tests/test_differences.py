@@ -0,0 +1,75 @@
+from aexpy.models import ApiDescription, ApiDifference
+from aexpy.models.description import FunctionEntry
+from aexpy.models.difference import BreakingRank, DiffEntry
+from aexpy.models.typing import PAYLOAD_PREFIX, ClassType
+
+
+def entry(id: str, kind: str, rank: BreakingRank):
+    return DiffEntry(id=id, kind=kind, rank=rank)
+
+
+def test_replace():
+    diff = ApiDifference()
+    diff.entries["a"] = entry("a", "AddFunction", BreakingRank.Compatible)
+    assert [e.id for e in diff.kind("AddFunction")] == ["a"]
+
+    # same key and size
+    diff.entries["a"] = entry("a", "RemoveFunction", BreakingRank.High)
+    assert diff.kinds() == ["RemoveFunction"]
+    assert diff.evaluate() == (BreakingRank.High, {BreakingRank.High: 1})
+
+
+def test_assign():
+    diff = ApiDifference.model_validate(
+        {"entries": {"a": entry("a", "AddFunction", BreakingRank.Compatible)}}
+    )
+    assert diff.rankCounts() == {BreakingRank.Compatible: 1}
+    diff.entries = {"b": entry("b", "RemoveFunction", BreakingRank.High)}
+    assert diff.kinds() == ["RemoveFunction"]
+    diff.entries.pop("b")
+    assert diff.kinds() == []
+
+
+def test_inplace():
+    diff = ApiDifference()
+    diff.entries["a"] = entry("a", "AddFunction", BreakingRank.Unknown)
+    assert diff.rankCounts() == {BreakingRank.Unknown: 1}
+    diff.entries["a"].rank = BreakingRank.Low
+    diff.clearIndex()
+    assert diff.breaking(BreakingRank.Low)[0].id == "a"
+
+
+def test_payloads():
+    old, new = ApiDescription(), ApiDescription()
+    for api, key in ((old, "a"), (new, "b")):
+        api.add(
+            FunctionEntry(
+                id="m.f", returnType=ClassType(id="m.C", data=PAYLOAD_PREFIX + key)
+            )
+        )
+        api.typePayloads = {key: {"type": key}, "unused": {}}
+    diff = ApiDifference()
+    diff.entries["f"] = DiffEntry(id="f", old=old["m.f"], new=new["m.f"])
+    diff.collectTypePayloads(old, new)
+    assert diff.typePayloads == {"a": {"type": "a"}, "b": {"type": "b"}}
+    entry = diff.entries["f"].new
+    assert isinstance(entry, FunctionEntry) and entry.returnType is not None
+    assert diff.typePayload(entry.returnType) == {"type": "b"}
+
+
+def test_slim():
+    old, new = ApiDescription(), ApiDescription()
+    old.add(FunctionEntry(id="m.f"))
+    new.add(FunctionEntry(id="m.f", name="f"))
+    full = ApiDifference()
+    full.entries["f"] = DiffEntry(
+        id="f", kind="ChangeFunction", old=old["m.f"], new=new["m.f"]
+    )
+    diff = full.slim().attach(old, new)
+    (resolved,) = diff.kind("ChangeFunction")
+    assert resolved.old == old["m.f"] and resolved.new == new["m.f"]
+    assert diff.breaking(BreakingRank.Unknown)[0].new == new["m.f"]
+    # stored entries stay slim
+    stored = diff.entries["f"]
+    assert stored.old is None and stored.new is None and stored.newId == "m.f"
+    assert "newId" in diff.model_dump_json(exclude_defaults=True)
@@ -0,0 +1,211 @@
+import json
+import logging
+import subprocess
+import sys
+import sysconfig
+import threading
+import zipfile
+from pathlib import Path
+
+import pytest
+from mypy.types import AnyType, NoneType, TypeOfAny, UnionType
+
+from aexpy.environments import (ExecutionEnvironment,
+                                ExecutionEnvironmentBuilder,
+                                ExecutionEnvironmentRunner)
+from aexpy.environments.pool import PooledEnvironmentBuilder
+from aexpy.extracting.agent import DetectorAgent, _agents, usingAgent
+from aexpy.extracting.base import BaseExtractor, readStream
+from aexpy.extracting.enriching.types import TypeEncoder
+from aexpy.models import ApiDescription, Distribution
+from aexpy.models.description import FunctionEntry, ItemScope
+
+
+class FailedRunner(ExecutionEnvironmentRunner):
+    """Runner whose detector exits before opening the stream."""
+
+    def runPythonText(self, /, command, **kwargs):
+        return subprocess.CompletedProcess(command, 1, "", "failed")
+
+
+def test_failed_detector():
+    result = ApiDescription(distribution=Distribution(topModules=["m"]))
+    done = threading.Event()
+
+    def extract():
+        with pytest.raises(subprocess.CalledProcessError):
+            BaseExtractor(agent=False).extractInEnv(result, FailedRunner())
+        done.set()
+
+    threading.Thread(target=extract, daemon=True).start()
+    assert done.wait(5)
+
+
+def test_stream(tmp_path: Path):
+    file = tmp_path / "entries.ndjson"
+    entry = FunctionEntry(id="m.f", name="f")
+    # a patch record whose keys are not in the usual order
+    patch = {"patch": {"scope": 1, "private": True}, "id": "m.f"}
+    file.write_text(entry.model_dump_json() + "\n\n" + json.dumps(patch) + "\n")
+
+    api = ApiDescription()
+    readStream(api, file)
+    assert api["m.f"].private and api["m.f"].scope == ItemScope.Class
+
+
+PACKAGE = "aexpyagenttest"
+
+
+def wheel(tmp_path: Path):
+    """A wheel installing a .pth file that adds the package directory, like editable installs."""
+
+    src = tmp_path / "src"
+    (src / PACKAGE).mkdir(parents=True)
+    (src / PACKAGE / "__init__.py").write_text("def f(): ...\n")
+    info = f"{PACKAGE}-1.0.dist-info"
+    file = tmp_path / f"{PACKAGE}-1.0-py3-none-any.whl"
+    with zipfile.ZipFile(file, "w") as zf:
+        zf.writestr(f"{PACKAGE}.pth", f"{src}\n")
+        zf.writestr(
+            f"{info}/METADATA",
+            f"Metadata-Version: 2.1\nName: {PACKAGE}\nVersion: 1.0\n",
+        )
+        zf.writestr(
+            f"{info}/WHEEL",
+            "Wheel-Version: 1.0\nGenerator: test\nRoot-Is-Purelib: true\nTag: py3-none-any\n",
+        )
+        zf.writestr(f"{info}/RECORD", "")
+    return file
+
+
+@pytest.fixture
+def venv(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """A virtual environment sharing the packages of the current one (for pydantic and pip)."""
+
+    root = tmp_path / "env"
+    subprocess.run(
+        [sys.executable, "-m", "venv", "--without-pip", str(root)], check=True
+    )
+    python = root / "bin" / "python"
+    purelib = subprocess.run(
+        [python, "-c", "import sysconfig; print(sysconfig.get_path('purelib'))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    Path(purelib, "aexpy-parent.pth").write_text(
+        f"import site; site.addsitedir({sysconfig.get_path('purelib')!r})\n"
+    )
+    monkeypatch.setenv(
+        "PYTHONPATH", str(Path(__file__).parent.parent / "src"), prepend=":"
+    )
+    return ExecutionEnvironmentRunner(pythonName=str(python))
+
+
+def test_agent(tmp_path: Path, venv: ExecutionEnvironmentRunner):
+    agent = DetectorAgent(venv, logging.getLogger("agent"))
+    try:
+        res = agent.install(["--no-index", str(wheel(tmp_path))])
+        assert res.returncode == 0, res.stderr
+
+        # installed after the agent started
+        stream = tmp_path / "entries.ndjson"
+        res = agent.extract(
+            Distribution(rootPath=tmp_path, topModules=[PACKAGE]), stream
+        )
+        assert res.returncode == 0, res.stderr
+        api = ApiDescription()
+        readStream(api, stream)
+        assert f"{PACKAGE}.f" in api
+
+        # no response to read
+        with pytest.raises(TimeoutError):
+            agent.readline(0.1)
+        assert not agent.alive
+    finally:
+        agent.close()
+
+
+class RunnerEnvironment(ExecutionEnvironment):
+    def __init__(
+        self,
+        /,
+        runner: ExecutionEnvironmentRunner,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        super().__init__(logger)
+        self._runner = runner
+
+    def runner(self, /):
+        return self._runner
+
+
+def test_release(venv: ExecutionEnvironmentRunner):
+    with usingAgent(venv, logging.getLogger("agent")) as agent:
+        RunnerEnvironment(venv).release()
+        # closed at the end of use
+        assert agent.alive and agent not in _agents.values()
+    assert not agent.alive
+
+
+def test_evict(venv: ExecutionEnvironmentRunner, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("aexpy.extracting.agent.MAX_AGENTS", 1)
+    logger = logging.getLogger("agent")
+    other = ExecutionEnvironmentRunner(commandPrefix="env", pythonName=venv.pythonName)
+    try:
+        with usingAgent(venv, logger) as first:
+            with usingAgent(other, logger) as second:
+                # agents in use are not evicted
+                assert first.alive and second.alive
+            assert first.alive
+        with usingAgent(venv, logger) as agent:
+            assert agent is first and not second.alive
+    finally:
+        RunnerEnvironment(venv).release()
+        RunnerEnvironment(other).release()
+
+
+class RunnerEnvironmentBuilder(ExecutionEnvironmentBuilder[RunnerEnvironment]):
+    def __init__(self, /, runner: ExecutionEnvironmentRunner) -> None:
+        super().__init__()
+        self.runner = runner
+
+    def build(self, /, pyversion="3.12", logger=None):
+        return RunnerEnvironment(self.runner, logger)
+
+    def clean(self, /, env):
+        pass
+
+
+def test_pool(venv: ExecutionEnvironmentRunner):
+    pool = PooledEnvironmentBuilder(RunnerEnvironmentBuilder(venv), size=1)
+    assert not pool.cloning
+    try:
+        envs: list[RunnerEnvironment] = []
+        agents: list[DetectorAgent] = []
+        for name in ("first", "second"):
+            with pool.bind(logging.getLogger(name)).use() as env:
+                assert env.logger.name == f"{name}.sub-env"
+                envs.append(env)
+                with usingAgent(env.runner(), env.logger) as agent:
+                    agents.append(agent)
+                assert agents[-1].alive
+            # the environment is returned to the pool, without its agent
+            assert not agents[-1].alive
+        assert envs[0] is envs[1] and agents[0] is not agents[1]
+    finally:
+        pool.close()
+
+
+def test_union_payloads():
+    api = ApiDescription()
+    encoder = TypeEncoder(logging.getLogger(), api)
+    items = [NoneType(), AnyType(TypeOfAny.explicit)]
+    # equal mypy types, whose payloads keep their own orders
+    for type in (UnionType(items), UnionType(items[::-1])):
+        encoded = encoder.encode(type)
+        assert encoded is not None
+        payload = api.typePayload(encoded)
+        assert [item[".class"] for item in payload["items"]] == [
+            item.serialize()[".class"] for item in type.items
+        ]
@@ -0,0 +1,52 @@
+from datetime import timedelta
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from aexpy.models import ApiDescription, Distribution, ProduceState, Release
+from aexpy.tools.stores import DirectoryProductStore, SqliteProductStore
+from aexpy.tools.stores.cli import storeIndex, storeQuery
+
+
+def description(version: str, state: ProduceState):
+    return ApiDescription(
+        distribution=Distribution(release=Release(project="m", version=version)),
+        state=state,
+        duration=timedelta(seconds=3),
+        producer="extractor",
+    )
+
+
+def fill(root: Path):
+    store = DirectoryProductStore(root)
+    store.save(description("1", ProduceState.Success))
+    store.save(description("2", ProduceState.Failure), log="failed")
+    return store
+
+
+def test_directory(tmp_path: Path):
+    store = fill(tmp_path)
+    records = {record.version: record for record in store.query(project="m")}
+    assert records["1"].state == ProduceState.Success
+    assert records["2"].state == ProduceState.Failure
+    assert records["2"].producer == "extractor"
+    assert records["2"].duration == timedelta(seconds=3)
+
+
+def test_index(tmp_path: Path):
+    fill(tmp_path / "data")
+    db = tmp_path / "products.db"
+    result = CliRunner().invoke(storeIndex, [str(tmp_path / "data"), str(db)])
+    assert result.exit_code == 0, result.output
+
+    store = SqliteProductStore(db)
+    try:
+        failed = list(store.query(kind="extract", state=ProduceState.Failure))
+        assert [record.version for record in failed] == ["2"]
+        assert store.log("extract", failed[0].target) == "failed"
+    finally:
+        store.close()
+
+    result = CliRunner().invoke(storeQuery, [str(db), "-k", "extract", "-s", "success"])
+    assert result.exit_code == 0, result.output
+    assert [line for line in result.output.splitlines() if '"version":"1"' in line]
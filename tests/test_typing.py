@@ -0,0 +1,79 @@
+from aexpy.diffing.evaluators.typing import ApiTypeCompatibilityChecker
+from aexpy.models import ApiDescription
+from aexpy.models.description import (AttributeEntry, ClassEntry,
+                                      FunctionEntry, Parameter)
+from aexpy.models.typing import ClassType, TypeFactory, TypeTable
+
+
+def description(*classes: ClassEntry):
+    api = ApiDescription()
+    for entry in classes:
+        api.add(entry)
+    return api
+
+
+def test_memo():
+    api = description()
+    checker = ApiTypeCompatibilityChecker.of(api)
+    table = api.typeTable()
+    a = TypeFactory.sum(TypeFactory.none(), TypeFactory.fromType(int))
+    none = table.intern(TypeFactory.none())
+    assert checker.isCompatibleTo(none, table.intern(a))
+    size, types = len(checker.memo), len(table)
+    # structurally equal types are interned as the same object, sharing the results
+    assert checker.isCompatibleTo(none, table.intern(a.model_copy(deep=True)))
+    assert (len(checker.memo), len(table)) == (size, types)
+    # other types are compared directly, without growing the table
+    assert checker.isCompatibleTo(TypeFactory.none(), a.model_copy(deep=True))
+    assert (len(checker.memo), len(table)) == (size, types)
+
+
+def test_descriptions():
+    a = description(ClassEntry(id="m.B", mros=["m.B", "m.A"]))
+    b = description(ClassEntry(id="m.B", mros=["m.B"]))
+    sub, base = ClassType(id="m.B"), ClassType(id="m.A")
+    # interleaved descriptions keep their own checkers
+    assert ApiTypeCompatibilityChecker.of(a).isCompatibleTo(sub, base)
+    assert not ApiTypeCompatibilityChecker.of(b).isCompatibleTo(sub, base)
+    assert ApiTypeCompatibilityChecker.of(a).isCompatibleTo(sub, base)
+    assert ApiTypeCompatibilityChecker.of(a) is ApiTypeCompatibilityChecker.of(a)
+
+
+def test_canonical():
+    table = TypeTable()
+    none, integer = TypeFactory.none(), TypeFactory.fromType(int)
+    nested = TypeFactory.sum(integer, TypeFactory.sum(none, integer.model_copy()))
+    canonical = table.canonical(nested)
+    # flattened and deduplicated, in the first order of members
+    assert str(canonical) == "[builtins.int | none]"
+    assert table.canonical(TypeFactory.sum(integer, none)) is canonical
+    assert (
+        str(table.canonical(TypeFactory.sum(none, integer))) == "[none | builtins.int]"
+    )
+
+
+def test_references():
+    optional = TypeFactory.sum(TypeFactory.none(), TypeFactory.fromType(int))
+    api = description()
+    api.add(
+        FunctionEntry(
+            id="m.f",
+            parameters=[Parameter(name="a", type=optional)],
+            returnType=optional.model_copy(deep=True),
+        )
+    )
+    api.add(AttributeEntry(id="m.a", type=TypeFactory.list(optional)))
+    data = api.model_dump_json()
+    # stored once, entries refer to the table
+    assert data.count('"form":"sum"') == 1
+    loaded = ApiDescription.model_validate_json(data)
+    assert loaded.model_dump() == api.model_dump()
+    f, a = loaded["m.f"], loaded["m.a"]
+    assert isinstance(f, FunctionEntry) and isinstance(a, AttributeEntry)
+    assert f.parameters[0].type is f.returnType
+    assert f.returnType in loaded.typeTable()
+    # standalone entries keep their types
+    assert '"form":"sum"' in f.model_dump_json()
+    assert (
+        ApiDescription.model_validate(api.model_dump()).model_dump() == api.model_dump()
+    )